@@ -10,6 +10,26 @@ from .core import (
     no_error,
     values_for_key,
     max_depth,
+    register_children,
+    count,
+    exists,
+    first,
+    total,
+    minimum,
+    maximum,
+    top,
+    select,
+    IncrementalPick,
+    diff,
+    PickCursor,
+    transform,
+    pick_array,
+    pick_strings,
+    PackedStrings,
+    scan_bytes,
+    sample,
+    estimate_count,
+    BloomFilter,
 )
 
 __version__ = "0.16.0"
@@ -22,4 +42,24 @@ __all__ = (
     "no_error",
     "values_for_key",
     "max_depth",
+    "register_children",
+    "count",
+    "exists",
+    "first",
+    "total",
+    "minimum",
+    "maximum",
+    "top",
+    "select",
+    "IncrementalPick",
+    "diff",
+    "PickCursor",
+    "transform",
+    "pick_array",
+    "pick_strings",
+    "PackedStrings",
+    "scan_bytes",
+    "sample",
+    "estimate_count",
+    "BloomFilter",
 )
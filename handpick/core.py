@@ -1,9 +1,44 @@
-from collections.abc import Mapping
+import re
+import sys
+import threading
+from array import array
+from collections import deque, namedtuple
+from collections.abc import (
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Sequence,
+    Set,
+    Sized,
+)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from copy import copy
+from dataclasses import fields, is_dataclass
+from functools import lru_cache, partial
+from hashlib import blake2b
+from heapq import nlargest, nsmallest
+from itertools import chain, count as _counter, islice, repeat
+from math import ceil, exp, floor, fsum, inf, log, sqrt
+from operator import attrgetter, is_
+from random import Random
 
 _ERRORS = (TypeError, ValueError, LookupError, AttributeError)
+_NO_DEFAULT = object()
 
 
-def pick(data, predicate=None, *, collections=True, dict_keys=False, bytes_like=False):
+def pick(
+    data,
+    predicate=None,
+    *,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+    workers=None,
+    ordered=True,
+    unique=None,
+    seen=None,
+):
     """Pick objects from `data` based on `predicate`.
 
     Traverse `data` recursively and yield all objects for which
@@ -27,38 +62,116 @@ def pick(data, predicate=None, *, collections=True, dict_keys=False, bytes_like=
 
     Strings are not treated as collections of other objects and
     therefore not iterated by the recursive algorithm.
+
+    Objects of classes registered using `register_children` or defining
+    the `__handpick_children__` method are treated as collections of
+    the objects they contain.
+
+    On free-threaded Python builds, `data` can be traversed by a pool
+    of `workers` threads, each inspecting a part of `data` and yielding
+    its picked objects at once. Objects are yielded in the usual order
+    unless `ordered=False` is passed, in which case each part's objects
+    are yielded as soon as the part is finished. On builds with the GIL
+    enabled, `workers` is ignored.
+
+    To skip objects that have already been picked, pass `unique` with
+    one of the following values:
+
+    - ``"value"`` skips objects equal to a previously picked object
+      (picked objects must be hashable),
+    - ``"identity"`` skips objects that have already been picked,
+    - ``"structure"`` skips objects of the same type and structure as
+      a previously picked object (also for unhashable collections).
+
+    By default, already picked objects are remembered in a set. Another
+    container with the `add` method and the `in` operator, e.g.
+    a `BloomFilter` of limited size, can be passed as `seen`.
     """
+    predicate = _check_predicate(predicate)
+    if _use_threads(workers):
+        picked = _parallel_walk(
+            data, predicate, collections, dict_keys, bytes_like, workers, ordered
+        )
+    else:
+        picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    if unique is not None:
+        picked = _unique(picked, unique, set() if seen is None else seen, bytes_like)
+    elif seen is not None:
+        raise ValueError("seen can only be used with unique")
+    yield from picked
+
+
+def _default_predicate(_):
+    return True
+
+
+def _check_predicate(predicate):
     if predicate is None:
-        predicate = _default_predicate
+        return _default_predicate
     if not callable(predicate):
         raise TypeError("predicate must be callable")
+    return predicate
+
+
+def _walk(data, predicate, collections, dict_keys, bytes_like):
+    # iterative equivalent of recursive traversal, so that the cost
+    # of yielding an object doesn't grow with its nested depth
     if not _is_collection(data, bytes_like):
         return
+    if _is_byte_sequence(data, bytes_like):
+        yield from filter(predicate, data)
+        return
 
-    is_mapping = _is_mapping(data)
-    for obj in data:
-        if is_mapping:
-            # (key, value) or just (value,)
-            obj = (obj, data[obj]) if dict_keys else (data[obj],)
-        elif collections or not _is_collection(obj, bytes_like):
+    stack = [_iter_children(data, dict_keys)]
+    while stack:
+        for obj in stack[-1]:
+            is_collection = _is_collection(obj, bytes_like)
             # test object against predicate
-            if predicate(obj):
+            if (collections or not is_collection) and predicate(obj):
                 yield obj
-        # inspect object recursively
-        yield from pick(
-            obj,
-            predicate,
-            collections=collections,
-            dict_keys=dict_keys,
-            bytes_like=bytes_like,
-        )
+            if not is_collection:
+                continue
+            if _is_byte_sequence(obj, bytes_like):
+                # items are ints, no need to inspect them recursively
+                yield from filter(predicate, obj)
+                continue
+            # inspect object recursively
+            stack.append(_iter_children(obj, dict_keys))
+            break
+        else:
+            stack.pop()
 
 
-def _default_predicate(_):
-    return True
+def _is_byte_sequence(obj, bytes_like):
+    cls = type(obj)
+    if cls is memoryview:
+        return obj.ndim == 1 and obj.format in ("B", "b")
+    return bytes_like and (cls is bytes or cls is bytearray)
+
+
+def _iter_children(data, dict_keys):
+    extract = _extractor(type(data))
+    if extract is not None:
+        return iter(extract(data))
+    if type(data) is dict:
+        # keys and values, or just values
+        return chain.from_iterable(data.items()) if dict_keys else iter(data.values())
+    if _is_mapping(data):
+        # values are looked up by key, which may be customized by subclasses
+        return _iter_mapping(data, dict_keys)
+    return iter(data)
+
+
+def _iter_mapping(data, dict_keys):
+    for key in data:
+        if dict_keys:
+            yield key
+        yield data[key]
 
 
 def _is_collection(obj, bytes_like=False):
+    if _extractor(type(obj)) is not None:
+        return True
     try:
         iter(obj)
     except TypeError:
@@ -75,6 +188,101 @@ def _is_mapping(obj):
     return isinstance(obj, Mapping)
 
 
+# custom collections
+
+_REGISTRY = {}
+_EXTRACTORS = {}
+_MAX_EXTRACTORS = 1024
+_REGISTRY_LOCK = threading.Lock()
+
+
+def register_children(cls, func=None):
+    """Make instances of `cls` traversable.
+
+    `func` must take an instance of `cls` and return an iterable of
+    the objects contained in it, which are then inspected recursively
+    like the items of a sequence. This also applies to subclasses of
+    `cls`.
+
+    If `func` is omitted or None, `cls` must be a dataclass or a class
+    with `__slots__`, and the values of its fields or slots are used.
+    In that case, `register_children` can be used as a class decorator.
+
+    Alternatively, a class can define the method
+    `__handpick_children__` returning the contained objects.
+    """
+    if func is None:
+        func = _fields_getter(cls)
+    with _REGISTRY_LOCK:
+        _REGISTRY[cls] = func
+        _EXTRACTORS.clear()
+    return cls
+
+
+def _extractor(cls):
+    try:
+        return _EXTRACTORS[cls]
+    except KeyError:
+        pass
+
+    # lock prevents caching a result computed from an outdated registry
+    with _REGISTRY_LOCK:
+        for base in cls.__mro__:
+            if base in _REGISTRY:
+                func = _REGISTRY[base]
+                break
+        else:
+            func = getattr(cls, "__handpick_children__", None)
+        if len(_EXTRACTORS) >= _MAX_EXTRACTORS:
+            # don't keep a growing number of (possibly temporary) classes alive
+            _EXTRACTORS.clear()
+        _EXTRACTORS[cls] = func
+    return func
+
+
+def _fields_getter(cls):
+    if is_dataclass(cls):
+        names = [field.name for field in fields(cls)]
+    elif any("__slots__" in vars(base) for base in cls.__mro__):
+        names = _slot_names(cls)
+    else:
+        raise TypeError(f"{cls.__name__} is neither a dataclass nor a slotted class")
+
+    if not names:
+        return _no_children
+    getter = attrgetter(*names)
+
+    def get_fields(obj):
+        try:
+            values = getter(obj)
+        except AttributeError:
+            # unset slots are skipped
+            values = (getattr(obj, name, _NO_DEFAULT) for name in names)
+            return tuple(value for value in values if value is not _NO_DEFAULT)
+        return (values,) if len(names) == 1 else values
+
+    return get_fields
+
+
+def _slot_names(cls):
+    names = []
+    for base in reversed(cls.__mro__):
+        slots = vars(base).get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ("__dict__", "__weakref__"):
+                continue
+            if name.startswith("__") and not name.endswith("__"):
+                # private name mangling
+                name = f"_{base.__name__.lstrip('_')}{name}"
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def _no_children(_):
+    return ()
+
+
 class Predicate:
     """Decorator wrapping a function in a predicate object.
 
@@ -186,28 +394,90 @@ def no_error(func):
 # useful functions
 
 
-def values_for_key(data, key):
+def values_for_key(data, key, *, outermost=False, workers=None):
     """Pick values associated with a specific key.
 
     Traverse `data` recursively and yield a sequence of dictionary
     values that are mapped to `key`. `key` may be a list of multiple
     keys.
+
+    By default, dictionaries nested in a dictionary's values are
+    searched as well. To stop the search at dictionaries containing
+    any of the keys, pass `outermost=True`.
+
+    `workers` has the same meaning as for `pick`. It is ignored if
+    `outermost=True` is passed.
     """
     if not isinstance(key, list):
         key = [key]
 
-    for mapping in pick([data], _is_mapping):
-        for k in key:
-            if k in mapping:
-                yield mapping[k]
+    values = _values_getter(key)
+    if outermost:
+        yield from _outermost_values(data, values)
+        return
+    for mapping in pick([data], _is_mapping, workers=workers):
+        yield from values(mapping)
+
 
+_MANY_KEYS = 32
 
-def max_depth(data):
+
+def _values_getter(keys):
+    if len(keys) > _MANY_KEYS:
+        try:
+            positions = {k: i for i, k in enumerate(keys)}
+        except TypeError:
+            # unhashable key
+            positions = None
+        if positions is not None and len(positions) == len(keys):
+            return partial(_values_for_many_keys, keys, positions)
+    return partial(_values_for_keys, keys)
+
+
+def _values_for_keys(keys, mapping):
+    return [mapping[k] for k in keys if k in mapping]
+
+
+def _values_for_many_keys(keys, positions, mapping):
+    if len(mapping) * 4 > len(keys):
+        # sorting the matched keys would cost more than checking all keys
+        return _values_for_keys(keys, mapping)
+    common = mapping.keys() & positions.keys()
+    if len(common) > 1:
+        # same order as in the list of keys
+        common = sorted(common, key=positions.__getitem__)
+    return [mapping[k] for k in common]
+
+
+def _outermost_values(data, values):
+    stack = [iter((data,))]
+    while stack:
+        for obj in stack[-1]:
+            if _is_mapping(obj):
+                found = values(obj)
+                if found:
+                    yield from found
+                    continue
+            if _is_collection(obj):
+                stack.append(_iter_children(obj, dict_keys=False))
+                break
+        else:
+            stack.pop()
+
+
+def max_depth(data, *, workers=None):
     """Return maximum nested depth of `data`.
 
     `data` should be an iterable collection. Depth is counted from zero,
     i.e. the direct elements of `data` are in depth 0.
+
+    `workers` has the same meaning as for `pick`.
     """
+    if _use_threads(workers) and _is_collection(data):
+        tasks = _split_tasks(data, False, False, workers * _TASKS_PER_WORKER)
+        with ThreadPoolExecutor(workers) as executor:
+            depths = executor.map(_tasks_depth, _batches(tasks, workers))
+            return max(depths, default=0)
     return max(_iter_depth(data), default=0)
 
 
@@ -217,9 +487,1400 @@ def _iter_depth(data, depth=0):
 
     yield depth
 
-    is_mapping = _is_mapping(data)
-    for obj in data:
-        if is_mapping:
-            # switch from key to value and proceed
-            obj = data[obj]
-        yield from _iter_depth(obj, depth=depth + 1)
+    # explicit stack rather than nested generators, like in `_walk`
+    stack = [_iter_children(data, dict_keys=False)]
+    while stack:
+        for obj in stack[-1]:
+            if _is_collection(obj):
+                yield depth + len(stack)
+                stack.append(_iter_children(obj, dict_keys=False))
+                break
+        else:
+            stack.pop()
+
+
+# aggregates
+
+
+def count(data, predicate=None, *, collections=True, dict_keys=False, bytes_like=False):
+    """Return the number of objects that `pick` would yield."""
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    counter = _counter()
+    # consume picked objects at C speed, without storing them
+    deque(zip(picked, counter), maxlen=0)
+    return next(counter)
+
+
+def exists(
+    data, predicate=None, *, collections=True, dict_keys=False, bytes_like=False
+):
+    """Return True if `pick` would yield at least one object.
+
+    The traversal stops at the first picked object.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    return next(picked, _NO_DEFAULT) is not _NO_DEFAULT
+
+
+def first(
+    data,
+    predicate=None,
+    *,
+    default=None,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return the first object that `pick` would yield, or `default`
+    if there is none.
+
+    The traversal stops at the first picked object.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    return next(picked, default)
+
+
+def total(
+    data,
+    predicate=None,
+    *,
+    start=0,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return the sum of `start` and the objects that `pick` would
+    yield.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    return sum(picked, start)
+
+
+def minimum(
+    data,
+    predicate=None,
+    *,
+    key=None,
+    default=_NO_DEFAULT,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return the smallest object that `pick` would yield.
+
+    `key` and `default` have the same meaning as for the built-in `min`
+    function. If nothing is picked and `default` is omitted, raise
+    ValueError.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    if default is _NO_DEFAULT:
+        return min(picked, key=key)
+    return min(picked, key=key, default=default)
+
+
+def maximum(
+    data,
+    predicate=None,
+    *,
+    key=None,
+    default=_NO_DEFAULT,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return the largest object that `pick` would yield.
+
+    `key` and `default` have the same meaning as for the built-in `max`
+    function. If nothing is picked and `default` is omitted, raise
+    ValueError.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    if default is _NO_DEFAULT:
+        return max(picked, key=key)
+    return max(picked, key=key, default=default)
+
+
+def top(
+    data,
+    n,
+    predicate=None,
+    *,
+    key=None,
+    reverse=False,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return a list of the `n` largest objects that `pick` would
+    yield, largest first.
+
+    `key` has the same meaning as for the built-in `sorted` function.
+    To get the `n` smallest objects instead, pass `reverse=True`.
+    At most `n` objects are held in memory at a time.
+    """
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+    select_n = nsmallest if reverse else nlargest
+    return select_n(n, picked, key=key)
+
+
+# path queries
+
+
+def select(data, path):
+    """Select objects from `data` located by `path`.
+
+    `path` is a sequence of steps, or a string of steps separated by
+    dots. Each step is one of the following:
+
+    - ``"*"`` selects all values of a mapping or all items of another
+      collection,
+    - ``"**"`` selects the current object and all objects nested in it,
+      recursively,
+    - a `Predicate` object keeps the current object only if it meets
+      the predicate,
+    - any other object is looked up as a key (mappings) or an index
+      (other subscriptable collections).
+
+    In string paths, steps made of digits are looked up as string keys
+    in mappings and as integer indices in other collections.
+
+    Only the keys and indices matched by `path` are descended into,
+    so the rest of `data` is never visited.
+    """
+    plan = _compile_path(path) if isinstance(path, str) else _compile_steps(path)
+    yield from _select(data, plan)
+
+
+_KEY, _ANY, _DESCEND, _FILTER = range(4)
+
+
+@lru_cache(maxsize=256)
+def _compile_path(path):
+    steps = []
+    for step in path.split("."):
+        if step.isdigit():
+            step = _Index(step)
+        steps.append(step)
+    return _compile_steps(steps)
+
+
+def _compile_steps(steps):
+    plan = []
+    for step in steps:
+        if isinstance(step, Predicate):
+            plan.append((_FILTER, step))
+        elif isinstance(step, str) and step == "*":
+            plan.append((_ANY, None))
+        elif isinstance(step, str) and step == "**":
+            plan.append((_DESCEND, None))
+        else:
+            plan.append((_KEY, step))
+    return tuple(plan)
+
+
+class _Index(str):
+    """String path step that doubles as an integer index."""
+
+    def __new__(cls, step):
+        obj = super().__new__(cls, step)
+        obj.index = int(step)
+        return obj
+
+
+def _select(data, plan):
+    # explicit stack of iterators over pairs (object, index of the next
+    # step) rather than nested generators, like in `_walk`
+    stack = [iter(((data, 0),))]
+    while stack:
+        for obj, i in stack[-1]:
+            # follow steps leading to a single object
+            while i < len(plan):
+                op, arg = plan[i]
+                if op == _KEY:
+                    found, obj = _lookup(obj, arg)
+                    if not found:
+                        break
+                elif op != _FILTER or not arg(obj):
+                    break
+                i += 1
+            else:
+                yield obj
+                continue
+
+            if op == _ANY:
+                stack.append(zip(_values(obj), repeat(i + 1)))
+                break
+            if op == _DESCEND:
+                descendants = zip(_values(obj), repeat(i))
+                stack.append(chain(((obj, i + 1),), descendants))
+                break
+        else:
+            stack.pop()
+
+
+def _lookup(obj, key):
+    if not _is_collection(obj):
+        return False, None
+    if _is_mapping(obj):
+        if key in obj:
+            return True, obj[key]
+        return False, None
+    if isinstance(key, _Index):
+        key = key.index
+    try:
+        return True, obj[key]
+    except (LookupError, TypeError):
+        return False, None
+
+
+def _values(obj):
+    if not _is_collection(obj):
+        return ()
+    return _iter_children(obj, dict_keys=False)
+
+
+# incremental queries
+
+
+class IncrementalPick:
+    """Repeatable `pick` query that reuses results for unchanged parts
+    of the data.
+
+    Calling the instance with `data` returns an iterator over the same
+    objects as ``pick(data, predicate, ...)``. Every collection in
+    `data` is identified by a structural hash of its contents, and the
+    results for each collection are kept until the next call. When the
+    instance is called again, e.g. after a small change of the data,
+    `predicate` is only applied inside collections whose hash has
+    changed. Collections whose items are the very same objects as in
+    the previous call are not hashed again.
+
+    Results are reused for structurally equal collections, so
+    `predicate` must depend on the inspected object only. Dictionary
+    keys picked with `dict_keys=True` may be taken from a previous
+    version of the data (they compare equal). The instance keeps
+    references to the collections of the previous data.
+    """
+
+    def __init__(
+        self, predicate=None, *, collections=True, dict_keys=False, bytes_like=False
+    ):
+        self.predicate = _check_predicate(predicate)
+        self.collections = collections
+        self.dict_keys = dict_keys
+        self.bytes_like = bytes_like
+        self._cache = {}
+        self._records = {}
+
+    def __call__(self, data):
+        if not _is_collection(data, self.bytes_like):
+            return iter(())
+
+        hashes = {}
+        _structure_hash(data, self.bytes_like, hashes, self._records)
+        # forget collections which are no longer part of the data
+        self._records = {
+            key: record for key, record in self._records.items() if key in hashes
+        }
+        cache = {}
+        entry = self._match(data, hashes, cache)
+        self._cache = cache
+        return _resolve(data, entry)
+
+    def _match(self, data, hashes, cache):
+        # iterative equivalent of recursive matching, descending only
+        # into collections without cached results; collections are
+        # recognized by having been hashed
+        cached = self._cached(hashes.get(id(data)), cache)
+        if cached is not None:
+            return cached[1]
+
+        self._hash_children(data, hashes)
+        stack = [(hashes.get(id(data)), _steps(data, self.dict_keys), [], None, None)]
+        while True:
+            digest, steps, entry, parent_step, parent_matched = stack[-1]
+            for step, obj in steps:
+                if id(obj) not in hashes:
+                    matched = bool(self.predicate(obj))
+                    if matched:
+                        entry.append((step, True, ()))
+                    continue
+
+                obj_digest = hashes[id(obj)]
+                cached = self._cached(obj_digest, cache)
+                if cached is not None and cached[0] is not None:
+                    matched, sub = cached
+                else:
+                    matched = self.collections and bool(self.predicate(obj))
+                    if cached is None:
+                        self._hash_children(obj, hashes)
+                        substeps = _steps(obj, self.dict_keys)
+                        stack.append((obj_digest, substeps, [], step, matched))
+                        break
+                    sub = cached[1]
+                    cache[obj_digest] = matched, sub
+                if matched or sub:
+                    entry.append((step, matched, sub))
+            else:
+                stack.pop()
+                entry = tuple(entry)
+                if digest is not None:
+                    cache[digest] = parent_matched, entry
+                if not stack:
+                    return entry
+                if parent_matched or entry:
+                    stack[-1][2].append((parent_step, parent_matched, entry))
+
+    def _cached(self, digest, cache):
+        # whether the collection is picked (None if unknown) and its entry
+        if digest is None:
+            return None
+        cached = cache.get(digest, self._cache.get(digest))
+        if cached is not None:
+            cache[digest] = cached
+        return cached
+
+    def _hash_children(self, data, hashes):
+        # children of immutable collections reused by identity haven't
+        # been hashed yet
+        record = self._records.get(id(data))
+        if record is not None and record[5]:
+            for child in record[1]:
+                _structure_hash(child, self.bytes_like, hashes)
+
+
+def diff(old, new):
+    """Yield paths at which `new` differs from `old`.
+
+    Each path is a tuple of the keys and indices leading from the root
+    to a changed object. Objects are compared with ``==``, and equal
+    collections are skipped without being compared item by item. Keys
+    missing in one of the mappings and items beyond the end of the
+    shorter sequence are reported individually.
+    """
+    # iterative equivalent of recursive comparison; pairs are popped
+    # in the order of paths
+    stack = [((), old, new)]
+    while stack:
+        path, old, new = stack.pop()
+        if old is new or _equal(old, new):
+            continue
+
+        if type(old) is not type(new) or not _is_collection(old):
+            yield path
+            continue
+
+        if _is_mapping(old):
+            pairs = [
+                (path + (key,), old[key], new[key] if key in new else _MISSING)
+                for key in old
+            ]
+            pairs.extend(
+                (path + (key,), _MISSING, new[key]) for key in new if key not in old
+            )
+        elif isinstance(old, Sequence):
+            pairs = [
+                (
+                    path + (i,),
+                    old[i] if i < len(old) else _MISSING,
+                    new[i] if i < len(new) else _MISSING,
+                )
+                for i in range(max(len(old), len(new)))
+            ]
+        else:
+            yield path
+            continue
+
+        stack.extend(reversed(pairs))
+
+
+def _equal(old, new):
+    try:
+        return old == new
+    except RecursionError:
+        # too deeply nested to be compared at once, compare the items
+        return False
+
+
+# placeholder for a missing key or index, differing in type from any object
+_MISSING = type("_Missing", (), {"__slots__": ()})()
+
+# -1 is the only small integer sharing its hash with another one (-2)
+_MINUS_ONE = type("_MinusOne", (), {"__slots__": ()})()
+
+_ATOMS = frozenset((str, bytes, bytearray, int, float, complex, bool, type(None)))
+_BYTES_LIKE_ATOMS = _ATOMS - {bytes, bytearray}
+_IMMUTABLE = frozenset((tuple, frozenset, bytes))
+_BUILTIN_COLLECTIONS = frozenset((dict, list, tuple, set, frozenset))
+_INDEXABLE = frozenset((dict, list, tuple))
+
+
+def _structure_hash(data, bytes_like, hashes, records=None, by_value=False):
+    """Return a structural hash of `data`.
+
+    Hashes of collections are stored in `hashes` under their id. None
+    means that `data` contains an object which can't be hashed reliably.
+    Hashable objects other than collections and atoms are told apart by
+    identity, or by their type and hash if `by_value` is True.
+
+    If `records` is given, it maps ids of collections hashed before to
+    tuples ``(collection, children, nested, nested_hashes, hash, frozen)``.
+    A collection whose children are identical to the recorded ones, and
+    whose nested collections still have the recorded hashes, isn't
+    hashed again. Tuples and frozensets containing only immutable
+    objects are `frozen` and not even inspected. New records are added.
+    """
+    atoms = _BYTES_LIKE_ATOMS if bytes_like else _ATOMS
+    if not _is_collection(data, bytes_like):
+        return _leaf_hash(data, atoms, by_value)
+
+    # built-in collections whose children can be listed directly
+    plain = {cls for cls in _INDEXABLE if _EXTRACTORS.get(cls, _MISSING) is None}
+    chain_items = chain.from_iterable
+    recorded = {}.get if records is None else records.get
+    # iterative post-order traversal; state is None until the collection
+    # is visited for the first time
+    stack = [(data, None)]
+    while stack:
+        obj, state = stack.pop()
+        key = id(obj)
+        if key in hashes:
+            continue
+
+        if state is None:
+            record = recorded(key)
+            if record is not None and record[0] is not obj:
+                record = None
+            if record is not None and record[5]:
+                hashes[key] = record[4]
+                continue
+            cls = type(obj)
+            if cls in plain:
+                children = list(chain_items(obj.items()) if cls is dict else obj)
+            else:
+                children = list(_iter_children(obj, dict_keys=True))
+            if (
+                record is not None
+                and len(children) == len(record[1])
+                and all(map(is_, children, record[1]))
+            ):
+                subs = record[2]
+            else:
+                record = None
+                subs = [
+                    child
+                    for child in children
+                    if type(child) not in atoms
+                    and (
+                        type(child) in _BUILTIN_COLLECTIONS
+                        or _is_collection(child, bytes_like)
+                    )
+                ]
+            if subs:
+                # hash nested collections first
+                stack.append((obj, (children, subs, record)))
+                stack.extend(zip(subs, repeat(None)))
+                continue
+        else:
+            children, subs, record = state
+
+        sub_hashes = tuple(map(hashes.__getitem__, map(id, subs)))
+        if record is not None and sub_hashes == record[3]:
+            hashes[key] = record[4]
+            continue
+
+        types = tuple(map(type, children))
+        obj_hash = _items_hash(obj, children, types, atoms, hashes, by_value)
+        hashes[key] = obj_hash
+        # bytearrays may change without changing their identity
+        if records is not None and bytearray not in types:
+            frozen = (
+                type(obj) in _IMMUTABLE
+                and all(id(sub) in records and records[id(sub)][5] for sub in subs)
+                and len(subs) + sum(map(atoms.__contains__, types)) == len(children)
+            )
+            records[key] = obj, children, subs, sub_hashes, obj_hash, frozen
+
+    return hashes[id(data)]
+
+
+def _items_hash(obj, children, types, atoms, hashes, by_value):
+    kinds = set(types)
+    if kinds <= atoms and bytearray not in kinds:
+        items = children
+        if -1 in items:
+            items = [_MINUS_ONE if child == -1 else child for child in items]
+    else:
+        # other objects are replaced by their hashes
+        items = []
+        for child in children:
+            if type(child) in atoms:
+                items.append(_atom_value(child))
+                continue
+            child_hash = hashes.get(id(child), _MISSING)
+            if child_hash is _MISSING:
+                child_hash = _leaf_hash(child, atoms, by_value)
+            if child_hash is None:
+                return None
+            items.append(child_hash)
+    return hash((type(obj), types, tuple(items)))
+
+
+def _leaf_hash(data, atoms, by_value=False):
+    if type(data) in atoms:
+        return hash((type(data), _atom_value(data)))
+    try:
+        return hash((type(data) if by_value else id(data), hash(data)))
+    except TypeError:
+        return None
+
+
+def _atom_value(data):
+    # hashable equivalent of an atom
+    if type(data) is bytearray:
+        return bytes(data)
+    return _MINUS_ONE if data == -1 else data
+
+
+class _DictKey:
+    """Step to a mapping key (rather than to its value)."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+
+def _steps(data, dict_keys):
+    if _is_mapping(data) and _extractor(type(data)) is None:
+        for key in data:
+            if dict_keys:
+                yield _DictKey(key), key
+            yield key, data[key]
+    else:
+        yield from enumerate(_iter_children(data, dict_keys))
+
+
+def _resolve(data, entry):
+    # iterative equivalent of recursive resolution; children of
+    # collections which can't be indexed are listed once per collection
+    stack = [(_indexable(data), iter(entry))]
+    while stack:
+        children, entries = stack[-1]
+        for step, matched, sub in entries:
+            obj = step.key if type(step) is _DictKey else children[step]
+            if matched:
+                yield obj
+            if sub:
+                if (
+                    type(obj) in _INDEXABLE
+                    and _EXTRACTORS.get(type(obj), _MISSING) is None
+                ):
+                    stack.append((obj, iter(sub)))
+                else:
+                    stack.append((_indexable(obj), iter(sub)))
+                break
+        else:
+            stack.pop()
+
+
+def _indexable(data):
+    if _extractor(type(data)) is None and isinstance(data, (Mapping, Sequence)):
+        return data
+    return list(_iter_children(data, dict_keys=False))
+
+
+# resumable traversal
+
+
+class PickCursor:
+    """Iterator over the objects that `pick` would yield, with
+    a resumable position.
+
+    `checkpoint` is a tuple of integers describing how far the traversal
+    has got. It can be stored (e.g. as a JSON list) and passed to a new
+    cursor over the same, unchanged `data` to continue right after the
+    last object yielded by the previous cursor. An exhausted cursor has
+    the checkpoint ``()``.
+
+    A long traversal can be split into chunks by taking a limited
+    number of objects at a time, e.g. using `itertools.islice`, and
+    storing `checkpoint` after each chunk.
+    """
+
+    def __init__(
+        self,
+        data,
+        predicate=None,
+        *,
+        checkpoint=None,
+        collections=True,
+        dict_keys=False,
+        bytes_like=False,
+    ):
+        self.predicate = _check_predicate(predicate)
+        self.collections = collections
+        self.dict_keys = dict_keys
+        self.bytes_like = bytes_like
+        if not _is_collection(data, bytes_like):
+            self._stack = []
+        elif checkpoint is None:
+            self._stack = [[_iter_children(data, dict_keys), 0]]
+        else:
+            self._stack = _restore(data, checkpoint, dict_keys, bytes_like)
+
+    @property
+    def checkpoint(self):
+        return tuple(position for _, position in self._stack)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        stack = self._stack
+        while stack:
+            frame = stack[-1]
+            for obj in frame[0]:
+                frame[1] += 1
+                is_collection = _is_collection(obj, self.bytes_like)
+                if is_collection:
+                    # enter object before it is yielded, so that
+                    # the checkpoint points inside it
+                    stack.append([_iter_children(obj, self.dict_keys), 0])
+                if (self.collections or not is_collection) and self.predicate(obj):
+                    return obj
+                if is_collection:
+                    break
+            else:
+                stack.pop()
+        raise StopIteration
+
+
+def _restore(data, checkpoint, dict_keys, bytes_like):
+    stack = []
+    for depth, position in enumerate(checkpoint):
+        if not _is_collection(data, bytes_like) or position < 0:
+            raise ValueError("checkpoint does not match data")
+        children = _iter_children(data, dict_keys)
+        if depth + 1 < len(checkpoint):
+            # the last visited child is the collection entered next
+            if position == 0:
+                raise ValueError("checkpoint does not match data")
+            data = next(islice(children, position - 1, None), _NO_DEFAULT)
+            if data is _NO_DEFAULT:
+                raise ValueError("checkpoint does not match data")
+        elif type(children) in _SEEKABLE:
+            if position > children.__length_hint__():
+                raise ValueError("checkpoint does not match data")
+            children.__setstate__(position)
+        elif position:
+            last = next(islice(children, position - 1, None), _NO_DEFAULT)
+            if last is _NO_DEFAULT:
+                raise ValueError("checkpoint does not match data")
+        stack.append([children, position])
+    return stack
+
+
+_SEEKABLE = frozenset(type(iter(cls())) for cls in (list, tuple, bytes, bytearray))
+
+
+# parallel traversal
+
+_TASKS_PER_WORKER = 4
+
+
+def _use_threads(workers):
+    if workers is None:
+        return False
+    if workers < 1:
+        raise ValueError("workers must be a positive integer")
+    # threads only pay off if they can run Python code simultaneously
+    gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return workers > 1 and gil_enabled is not None and not gil_enabled()
+
+
+def _parallel_walk(
+    data, predicate, collections, dict_keys, bytes_like, workers, ordered
+):
+    if not _is_collection(data, bytes_like):
+        return
+
+    tasks = _split_tasks(data, dict_keys, bytes_like, workers * _TASKS_PER_WORKER)
+    executor = ThreadPoolExecutor(workers)
+    try:
+        futures = [
+            executor.submit(
+                _run_tasks, batch, predicate, collections, dict_keys, bytes_like
+            )
+            for batch in _batches(tasks, workers)
+        ]
+        for future in futures if ordered else as_completed(futures):
+            yield from future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _split_tasks(data, dict_keys, bytes_like, min_tasks):
+    """Return a list of tasks covering objects in `data` in pre-order.
+
+    Each task is a tuple ``(obj, depth, start, stop, descend)`` covering
+    the children of `obj` with indices from `start` to `stop`, which are
+    in nested depth `depth`. If `descend` is True, the task covers also
+    all objects nested in these children.
+
+    Children of a collection are divided into ranges without being
+    inspected. A range of a single collection is expanded into ranges
+    of its children until there are at least `min_tasks` tasks, and no
+    collection covered by a single task has more items than there are
+    tasks per batch.
+    """
+    # the last item tells whether the task may still need expanding
+    tasks = _ranges(data, 0, _width(data, dict_keys), min_tasks)
+    expanded = True
+    while expanded:
+        expanded = False
+        enough = len(tasks) >= min_tasks
+        limit = len(tasks) / min_tasks
+        new_tasks = []
+        for task in tasks:
+            obj, depth, start, stop, descend, unchecked = task
+            if unchecked:
+                # the limit only grows, so this task can't become too large
+                task = obj, depth, start, stop, descend, False
+                child = next(_range_children(obj, dict_keys, start, stop))
+                if _is_collection(child, bytes_like):
+                    width = _width(child, dict_keys)
+                    if not enough or width > limit:
+                        expanded = True
+                        new_tasks.append((obj, depth, start, stop, False, False))
+                        new_tasks.extend(_ranges(child, depth + 1, width, min_tasks))
+                        continue
+            new_tasks.append(task)
+        tasks = new_tasks
+    return [task[:5] for task in tasks]
+
+
+def _ranges(obj, depth, width, min_tasks):
+    # tasks for children of `obj`; only ranges of a single child may
+    # need expanding
+    size = max(1, width // min_tasks)
+    return [
+        (obj, depth, start, min(start + size, width), True, size == 1)
+        for start in range(0, width, size)
+    ]
+
+
+def _range_children(obj, dict_keys, start, stop):
+    children = _iter_children(obj, dict_keys)
+    if type(children) in _SEEKABLE:
+        children.__setstate__(start)
+        return islice(children, stop - start)
+    return islice(children, start, stop)
+
+
+def _width(obj, dict_keys):
+    # number of children
+    if _extractor(type(obj)) is None and isinstance(obj, Sized):
+        return len(obj) * 2 if dict_keys and _is_mapping(obj) else len(obj)
+    return sum(1 for _ in _iter_children(obj, dict_keys))
+
+
+def _batches(tasks, workers):
+    # more batches than workers, so that idle threads take over
+    # remaining work from the shared queue
+    size = max(1, -(-len(tasks) // (workers * _TASKS_PER_WORKER)))
+    return [tasks[i : i + size] for i in range(0, len(tasks), size)]
+
+
+def _run_tasks(tasks, predicate, collections, dict_keys, bytes_like):
+    picked = []
+    for obj, _, start, stop, descend in tasks:
+        for child in _range_children(obj, dict_keys, start, stop):
+            is_collection = _is_collection(child, bytes_like)
+            if (collections or not is_collection) and predicate(child):
+                picked.append(child)
+            if descend and is_collection:
+                picked.extend(
+                    _walk(child, predicate, collections, dict_keys, bytes_like)
+                )
+    return picked
+
+
+def _tasks_depth(tasks):
+    result = 0
+    for obj, depth, start, stop, descend in tasks:
+        for child in _range_children(obj, False, start, stop):
+            if descend:
+                result = max(result, max(_iter_depth(child, depth + 1), default=depth))
+            else:
+                # a collection whose children are covered by other tasks
+                result = max(result, depth + 1)
+    return result
+
+
+# transformation
+
+
+def transform(
+    data, predicate, func, *, collections=True, bytes_like=False, in_place=False
+):
+    """Return `data` with picked objects replaced by `func(obj)`.
+
+    Traverse `data` like `pick` does and replace every object for which
+    `predicate(obj)` is True or truthy with the result of `func(obj)`.
+    Replaced objects are not inspected any further. Dictionary keys are
+    never replaced.
+
+    Only the collections containing a replaced object, directly or
+    indirectly, are copied. All other objects are shared between `data`
+    and the result. To modify mutable collections in place instead of
+    copying them, pass `in_place=True`; immutable collections are still
+    copied. Collections occurring more than once in `data` are
+    transformed only once.
+
+    `collections` and `bytes_like` have the same meaning as for `pick`.
+    Raise TypeError if a collection that needs to be changed can't be
+    rebuilt.
+    """
+    predicate = _check_predicate(predicate)
+    if not _is_collection(data, bytes_like):
+        return data
+    return _transform(data, predicate, func, collections, bytes_like, in_place)
+
+
+def _transform(data, predicate, func, collections, bytes_like, in_place):
+    # iterative equivalent of recursive transformation; results are
+    # remembered by id, so that collections occurring more than once
+    # are transformed only once
+    results = {}
+    stack = [(data, _steps(data, dict_keys=False), [], None)]
+    while True:
+        data, steps, changes, parent_step = stack[-1]
+        for step, obj in steps:
+            is_collection = _is_collection(obj, bytes_like)
+            if (collections or not is_collection) and predicate(obj):
+                new = func(obj)
+            elif is_collection and id(obj) in results:
+                new = results[id(obj)]
+            elif is_collection:
+                stack.append((obj, _steps(obj, dict_keys=False), [], step))
+                break
+            else:
+                continue
+            if new is not obj:
+                changes.append((step, obj, new))
+        else:
+            stack.pop()
+            result = _rebuild(data, changes, in_place) if changes else data
+            results[id(data)] = result
+            if not stack:
+                return result
+            if result is not data:
+                stack[-1][2].append((parent_step, data, result))
+
+
+def _rebuild(data, changes, in_place):
+    if _extractor(type(data)) is not None:
+        raise TypeError(f"cannot rebuild {type(data).__name__} object")
+
+    if isinstance(data, (MutableMapping, MutableSequence)):
+        result = data if in_place else copy(data)
+        for step, _, new in changes:
+            result[step] = new
+        return result
+
+    if in_place and isinstance(data, MutableSet):
+        for _, old, _ in changes:
+            data.discard(old)
+        for _, _, new in changes:
+            data.add(new)
+        return data
+
+    if isinstance(data, (tuple, Set, bytes)):
+        items = list(data)
+        for step, _, new in changes:
+            items[step] = new
+        if hasattr(data, "_make"):
+            # named tuple
+            return data._make(items)
+        return type(data)(items)
+
+    raise TypeError(f"cannot rebuild {type(data).__name__} object")
+
+
+# compact results
+
+_WIDER_TYPECODES = {
+    "b": "h",
+    "B": "H",
+    "h": "i",
+    "H": "I",
+    "i": "l",
+    "I": "L",
+    "l": "q",
+    "L": "Q",
+    "q": "d",
+    "Q": "d",
+}
+_SIGNED_TYPECODES = {"B": "b", "H": "h", "I": "i", "L": "l", "Q": "q"}
+
+
+def pick_array(
+    data,
+    predicate=None,
+    typecode="d",
+    *,
+    size_hint=None,
+    overflow="raise",
+    ndarray=False,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return an `array.array` of the numbers that `pick` would yield.
+
+    `typecode` has the same meaning as for `array.array`. Picked objects
+    are stored directly in the array, without building a list first.
+    If the number of picked objects can be estimated, passing it as
+    `size_hint` allocates the array in advance.
+
+    By default, OverflowError is raised if an integer doesn't fit in the
+    array's type. If `overflow="widen"` is passed, the array is converted
+    to a wider integer type instead, and eventually to floats. Unsigned
+    arrays are converted to signed ones when a negative integer is picked.
+    Character typecodes (`"u"` and `"w"`) are not supported.
+
+    If `ndarray=True` is passed, return a NumPy array sharing memory with
+    the array instead. This requires NumPy to be installed.
+    """
+    if overflow not in ("raise", "widen"):
+        raise ValueError("overflow must be 'raise' or 'widen'")
+    if typecode in ("u", "w"):
+        raise ValueError(f"typecode must be numeric, not {typecode!r}")
+    predicate = _check_predicate(predicate)
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+
+    result = array(typecode, [0]) * size_hint if size_hint else array(typecode)
+    size = 0
+    for obj in picked:
+        while True:
+            try:
+                if size < len(result):
+                    result[size] = obj
+                else:
+                    result.append(obj)
+                break
+            except OverflowError:
+                if overflow == "raise" or result.typecode not in _WIDER_TYPECODES:
+                    raise
+                result = _widen(result, obj)
+        size += 1
+    del result[size:]
+
+    if ndarray:
+        import numpy
+
+        return numpy.frombuffer(result, dtype=result.typecode)
+    return result
+
+
+def _widen(values, obj):
+    # convert to the next type that can hold the values and possibly obj
+    typecode = values.typecode
+    if obj < 0 and typecode in _SIGNED_TYPECODES:
+        typecode = _SIGNED_TYPECODES[typecode]
+    else:
+        typecode = _WIDER_TYPECODES[typecode]
+    while True:
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            if typecode not in _WIDER_TYPECODES:
+                raise
+            typecode = _WIDER_TYPECODES[typecode]
+
+
+def pick_strings(
+    data, predicate=None, *, collections=True, dict_keys=False, bytes_like=False
+):
+    """Return a `PackedStrings` sequence of the strings that `pick` would
+    yield.
+
+    Raise TypeError if a picked object is not a string.
+    """
+    predicate = _check_predicate(predicate)
+    result = PackedStrings()
+    result.extend(_walk(data, predicate, collections, dict_keys, bytes_like))
+    return result
+
+
+class PackedStrings(Sequence):
+    """Sequence of strings stored in a single UTF-8 buffer.
+
+    Unlike a list of strings, it holds no string objects; each item is
+    decoded when accessed.
+    """
+
+    def __init__(self, strings=()):
+        self._buffer = bytearray()
+        self._offsets = array("Q", [0])
+        self.extend(strings)
+
+    def append(self, string):
+        if not isinstance(string, str):
+            raise TypeError(f"expected str, got {type(string).__name__}")
+        self._buffer += string.encode("utf-8", "surrogatepass")
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, strings):
+        for string in strings:
+            self.append(string)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PackedStrings index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._buffer[start:end].decode("utf-8", "surrogatepass")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+# binary data
+
+
+def scan_bytes(data, predicate=None, *, offsets=False, chunk_size=65536):
+    """Pick byte values from a bytes-like object based on `predicate`.
+
+    Yield the same ints as ``pick(data, predicate, bytes_like=True)``,
+    or their offsets in `data` if `offsets=True` is passed. `data` must
+    support the buffer protocol and is scanned as unsigned bytes.
+
+    `predicate` is called once for each of the 256 possible byte values
+    rather than for each byte, so it must depend on the value only.
+    `data` is then scanned in chunks of `chunk_size` bytes without
+    calling any Python code per byte.
+    """
+    predicate = _check_predicate(predicate)
+    matched = bytes(value for value in range(256) if predicate(value))
+    view = memoryview(data)
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+
+    if not matched:
+        return
+    if offsets:
+        if len(matched) == 256:
+            yield from range(len(view))
+            return
+        pattern = re.compile(b"[" + re.escape(matched) + b"]")
+        # the pattern is matched against the memory of `data` directly
+        for match in pattern.finditer(view):
+            yield match.start()
+        return
+
+    deleted = bytes(value for value in range(256) if value not in matched)
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size].tobytes()
+        yield from chunk.translate(None, deleted)
+
+
+# sampling
+
+_Estimate = namedtuple("Estimate", "count error probes")
+
+
+def sample(
+    data,
+    k,
+    predicate=None,
+    *,
+    budget=None,
+    seed=None,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Return a random sample of `k` objects that `pick` would yield.
+
+    Each picked object has the same chance of being included, and at
+    most `k` objects are held in memory at a time. If fewer than `k`
+    objects are picked, all of them are returned. The order of the
+    returned objects is arbitrary.
+
+    If `budget` is given, the whole `data` is not traversed. Instead,
+    random paths from the root to an object that is not a collection
+    are followed, like in `estimate_count`, until about `budget` objects
+    have been inspected. Objects found on the paths are weighted by how
+    unlikely they were to be found, so that each picked object has
+    approximately the same chance of being included. Like without
+    `budget`, an object found at several places is sampled separately
+    for each of them.
+
+    `seed` is used to initialize the random number generator.
+    """
+    if k < 0:
+        raise ValueError("sample size must be non-negative")
+    predicate = _check_predicate(predicate)
+    rng = Random(seed)  # nosec B311 - not used for security
+    if budget is not None:
+        return _sample_paths(
+            data, k, predicate, budget, collections, dict_keys, bytes_like, rng
+        )
+
+    picked = _walk(data, predicate, collections, dict_keys, bytes_like)
+
+    # reservoir sampling skipping over objects that won't be sampled
+    # (Li, 1994, Algorithm L)
+    reservoir = list(islice(picked, k))
+    if len(reservoir) < k or k == 0:
+        return reservoir
+    weight = exp(log(_uniform(rng)) / k)
+    while True:
+        skip = floor(log(_uniform(rng)) / log(1 - weight))
+        obj = next(islice(picked, skip, None), _NO_DEFAULT)
+        if obj is _NO_DEFAULT:
+            return reservoir
+        reservoir[rng.randrange(k)] = obj
+        weight *= exp(log(_uniform(rng)) / k)
+
+
+def estimate_count(
+    data,
+    predicate=None,
+    *,
+    budget=10_000,
+    seed=None,
+    collections=True,
+    dict_keys=False,
+    bytes_like=False,
+):
+    """Estimate the number of objects that `pick` would yield.
+
+    Instead of traversing the whole `data`, follow random paths from
+    the root to an object that is not a collection, until about `budget`
+    objects have been inspected. Each path gives an unbiased estimate
+    (Knuth, 1975), and the estimates are averaged.
+
+    Return a named tuple ``(count, error, probes)``, where the true
+    count is within ``count ± error`` with approximately 95% confidence
+    and `probes` is the number of followed paths. `seed` is used to
+    initialize the random number generator.
+    """
+    predicate = _check_predicate(predicate)
+    rng = Random(seed)  # nosec B311 - not used for security
+    if not _is_collection(data, bytes_like):
+        return _Estimate(0, 0.0, 0)
+
+    estimates = []
+    cost = 0
+    while cost < budget or not estimates:
+        estimate, probe_cost = _probe(
+            data, predicate, collections, dict_keys, bytes_like, rng
+        )
+        estimates.append(estimate)
+        cost += probe_cost
+
+    probes = len(estimates)
+    mean = fsum(estimates) / probes
+    if probes == 1:
+        return _Estimate(mean, inf, probes)
+    variance = fsum((e - mean) ** 2 for e in estimates) / (probes - 1)
+    return _Estimate(mean, 1.96 * sqrt(variance / probes), probes)
+
+
+def _sample_paths(data, k, predicate, budget, collections, dict_keys, bytes_like, rng):
+    if k == 0 or not _is_collection(data, bytes_like):
+        return []
+
+    # total weight of each position found, keyed by the indices leading
+    # to it, which is an unbiased estimate of how likely it is to be
+    # picked, multiplied by the number of followed paths
+    found = {}
+    cost = 0
+    while cost < budget:
+        picked = []
+        _, probe_cost = _probe(
+            data, predicate, collections, dict_keys, bytes_like, rng, picked
+        )
+        cost += probe_cost
+        for path, obj, weight in picked:
+            found.setdefault(path, [0, obj])[0] += weight
+
+    # weighted sampling without replacement (Efraimidis and Spirakis,
+    # 2006), using logarithms of the keys
+    keys = ((log(_uniform(rng)) / weight, obj) for weight, obj in found.values())
+    return [obj for _, obj in nlargest(k, keys, key=lambda item: item[0])]
+
+
+def _uniform(rng):
+    # random number from the open interval (0, 1)
+    while True:
+        value = rng.random()
+        if value:
+            return value
+
+
+def _probe(data, predicate, collections, dict_keys, bytes_like, rng, picked=None):
+    # paths to picked objects, the objects and their weights are
+    # appended to `picked`
+    estimate = 0
+    cost = 0
+    weight = 1
+    path = ()
+    while True:
+        obj, index, size, child_cost = _random_child(data, dict_keys, rng)
+        cost += child_cost
+        if not size:
+            return estimate, cost
+        # every object in this depth is represented by this one
+        weight *= size
+        path += (index,)
+        is_collection = _is_collection(obj, bytes_like)
+        if (collections or not is_collection) and predicate(obj):
+            estimate += weight
+            if picked is not None:
+                picked.append((path, obj, weight))
+        if not is_collection:
+            return estimate, cost
+        data = obj
+
+
+def _random_child(data, dict_keys, rng):
+    """Return a random child of `data`, its index, number of children
+    and the cost of choosing the child.
+    """
+    if _extractor(type(data)) is None:
+        if _is_mapping(data):
+            size = len(data) * (2 if dict_keys else 1)
+            if not size:
+                return None, None, 0, 1
+            index = rng.randrange(size)
+            position = index // 2 if dict_keys else index
+            key = next(islice(data, position, None))
+            obj = key if dict_keys and index % 2 == 0 else data[key]
+            return obj, index, size, position + 1
+        if isinstance(data, Sequence):
+            size = len(data)
+            if not size:
+                return None, None, 0, 1
+            index = rng.randrange(size)
+            return data[index], index, size, 1
+
+    children = list(_iter_children(data, dict_keys))
+    if not children:
+        return None, None, 0, 1
+    index = rng.randrange(len(children))
+    return children[index], index, len(children), len(children)
+
+
+# deduplication
+
+
+def _unique(picked, unique, seen, bytes_like):
+    if unique == "value":
+        key = None
+    elif unique == "identity":
+        key = id
+    elif unique == "structure":
+        # hashes of nested collections are computed only once
+        hashes = {}
+
+        def key(obj):
+            if _is_collection(obj, bytes_like):
+                obj_hash = _structure_hash(obj, bytes_like, hashes, by_value=True)
+                return ("id", id(obj)) if obj_hash is None else ("#", obj_hash)
+            if type(obj) is bytearray:
+                return bytearray, bytes(obj)
+            try:
+                hash(obj)
+            except TypeError:
+                return "id", id(obj)
+            return type(obj), obj
+
+    else:
+        raise ValueError("unique must be 'value', 'identity' or 'structure'")
+
+    for obj in picked:
+        obj_key = obj if key is None else key(obj)
+        if obj_key not in seen:
+            seen.add(obj_key)
+            yield obj
+
+
+class BloomFilter:
+    """Set-like container of a fixed size, remembering which objects
+    have been added.
+
+    The `in` operator is always True for added objects, but also for
+    other objects with a probability of about `error_rate`, provided that
+    no more than `capacity` objects have been added. Added objects must
+    be hashable; they are not stored in the filter.
+
+    Bloom filters can be passed as the `seen` argument to the `pick`
+    function.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self._hash_count = max(1, round(self._size / capacity * log(2)))
+        self._bits = bytearray(-(-self._size // 8))
+
+    def _positions(self, obj):
+        # type and value, so that objects with equal hashes (like -1
+        # and -2) are told apart
+        obj_hash = hash(obj)
+        if type(obj) in _ATOMS:
+            obj = _canonical_number(obj)
+            value = repr(obj)
+        else:
+            value = obj_hash
+        cls = type(obj)
+        key = f"{cls.__module__}.{cls.__qualname__}:{value}"
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        # double hashing
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hash_count):
+            yield (first + i * second) % self._size
+
+    def add(self, obj):
+        for position in self._positions(obj):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, obj):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(obj)
+        )
+
+
+def _canonical_number(obj):
+    # equal numbers are represented equally, like in a set
+    if type(obj) is complex and obj.imag == 0:
+        obj = obj.real
+    if type(obj) is float and obj.is_integer():
+        obj = int(obj)
+    if type(obj) is bool:
+        obj = int(obj)
+    return obj
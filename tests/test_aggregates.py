@@ -0,0 +1,92 @@
+import pytest
+
+from handpick import (
+    pick,
+    is_type,
+    count,
+    exists,
+    first,
+    total,
+    minimum,
+    maximum,
+    top,
+)
+
+DATA = [[4, [5.0, 1], 3.0], [[15, []], {17: [7, [8], 0]}], "x"]
+is_number = is_type((int, float))
+
+
+def test_count():
+    assert count(DATA) == len(list(pick(DATA)))
+    assert count(DATA, is_number) == 8
+    assert count(DATA, is_number, dict_keys=True) == 9
+    assert count(DATA, collections=False) == 9
+    assert count([]) == 0
+
+
+class TestShortCircuit:
+    @pytest.fixture
+    def stops_at_first(self):
+        def gen():
+            yield 1
+            raise AssertionError("traversal not stopped")
+
+        return [[0, 1], gen()]
+
+    def test_exists(self, stops_at_first):
+        assert exists(stops_at_first, is_type(int) & bool)
+        assert exists(DATA, is_type(str))
+        assert not exists(DATA, is_type(bytes))
+
+    def test_first(self, stops_at_first):
+        assert first(stops_at_first, is_type(int) & bool) == 1
+        assert first(DATA, is_type(float)) == 5.0
+        assert first(DATA, is_type(bytes)) is None
+        assert first(DATA, is_type(bytes), default=0) == 0
+
+
+def test_total():
+    assert total(DATA, is_number) == 43.0
+    assert total(DATA, is_type(float), start=0.5) == 8.5
+    assert total([]) == 0
+
+
+class TestMinMax:
+    def test_minimum(self):
+        assert minimum(DATA, is_number) == 0
+        assert minimum(DATA, is_number, key=lambda n: -n) == 15
+        assert minimum(DATA, is_number, dict_keys=True, key=lambda n: -n) == 17
+
+    def test_maximum(self):
+        assert maximum(DATA, is_number) == 15
+        assert maximum(DATA, is_number, key=lambda n: -n) == 0
+
+    @pytest.mark.parametrize("func", (minimum, maximum))
+    def test_empty(self, func):
+        assert func([], default=None) is None
+        with pytest.raises(ValueError):
+            func([])
+
+
+def test_top():
+    assert top(DATA, 3, is_number) == [15, 8, 7]
+    assert top(DATA, 3, is_number, reverse=True) == [0, 1, 3.0]
+    assert top(DATA, 2, is_type(list), key=len) == [[4, [5.0, 1], 3.0], [7, [8], 0]]
+    assert top(DATA, 0, is_number) == []
+
+
+@pytest.mark.parametrize(
+    "func",
+    (
+        count,
+        exists,
+        first,
+        total,
+        minimum,
+        maximum,
+        lambda data, pred: top(data, 1, pred),
+    ),
+)
+def test_non_callable_predicate_raises_error(func):
+    with pytest.raises(TypeError, match="predicate must be callable"):
+        func(DATA, 42)
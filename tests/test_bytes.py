@@ -0,0 +1,93 @@
+from array import array
+
+import pytest
+
+from handpick import pick, scan_bytes, Predicate
+from handpick import core
+
+BLOB = bytes(i * 37 % 256 for i in range(1000))
+
+
+@Predicate
+def is_letter(value):
+    return chr(value).isalpha()
+
+
+class TestPickFastPath:
+    @pytest.mark.parametrize("data", (BLOB, bytearray(BLOB), [1, [BLOB]]))
+    def test_same_results(self, data):
+        expected = [value for value in BLOB if chr(value).isalpha()]
+        assert list(pick(data, is_letter, bytes_like=True)) == expected
+
+    def test_items_not_inspected_recursively(self, monkeypatch):
+        calls = []
+        original = core._is_collection
+
+        def counting(obj, bytes_like=False):
+            calls.append(obj)
+            return original(obj, bytes_like)
+
+        monkeypatch.setattr(core, "_is_collection", counting)
+        assert list(pick([b"abc"], bytes_like=True)) == [b"abc", 97, 98, 99]
+        assert len(calls) == 2
+
+    def test_memoryview(self):
+        view = memoryview(b"ab")
+        assert list(pick([view])) == [view, 97, 98]
+        signed = memoryview(array("b", [-1, 2]))
+        assert list(pick([signed], collections=False)) == [-1, 2]
+        wide = memoryview(array("h", [300]))
+        assert list(pick([wide], collections=False)) == [300]
+
+
+class TestScanBytes:
+    @pytest.mark.parametrize("chunk_size", (1, 7, 4096))
+    def test_values(self, chunk_size):
+        expected = list(pick(BLOB, is_letter, bytes_like=True))
+        assert list(scan_bytes(BLOB, is_letter, chunk_size=chunk_size)) == expected
+
+    def test_offsets(self):
+        expected = [i for i, value in enumerate(BLOB) if is_letter(value)]
+        assert list(scan_bytes(BLOB, is_letter, offsets=True)) == expected
+
+    @pytest.mark.parametrize(
+        "predicate",
+        (
+            pytest.param(None, id="all"),
+            pytest.param(lambda value: False, id="none"),
+            pytest.param(lambda value: value in b"]\\^-[", id="special"),
+        ),
+    )
+    def test_special_value_sets(self, predicate):
+        expected = list(pick(BLOB, predicate, bytes_like=True))
+        assert list(scan_bytes(BLOB, predicate)) == expected
+        offsets = list(scan_bytes(BLOB, predicate, offsets=True))
+        assert [BLOB[i] for i in offsets] == expected
+
+    def test_predicate_called_once_per_value(self):
+        calls = []
+
+        def predicate(value):
+            calls.append(value)
+            return value == 0
+
+        assert list(scan_bytes(bytes(10_000), predicate, offsets=True)) == list(
+            range(10_000)
+        )
+        assert calls == list(range(256))
+
+    @pytest.mark.parametrize(
+        "data",
+        (
+            pytest.param(bytearray(b"a1b"), id="bytearray"),
+            pytest.param(memoryview(b"xa1b")[1:], id="memoryview"),
+            pytest.param(array("B", b"a1b"), id="array"),
+        ),
+    )
+    def test_bytes_like_objects(self, data):
+        assert list(scan_bytes(data, is_letter)) == [97, 98]
+        assert list(scan_bytes(data, is_letter, offsets=True)) == [0, 2]
+
+    def test_wider_items_scanned_as_bytes(self):
+        data = array("H", [0x6100])
+        assert len(list(scan_bytes(data))) == 2
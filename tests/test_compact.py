@@ -0,0 +1,122 @@
+from array import array
+
+import pytest
+
+from handpick import pick_array, pick_strings, PackedStrings, is_type
+
+DATA = {"a": [1.5, 2, {"b": 3}], "c": ("x", -4), "d": "yz"}
+is_number = is_type((int, float))
+
+
+class TestPickArray:
+    def test_default_typecode(self):
+        result = pick_array(DATA, is_number)
+        assert result == array("d", [1.5, 2, 3, -4])
+
+    def test_integer_typecode(self):
+        assert pick_array(DATA, is_type(int), "b") == array("b", [2, 3, -4])
+
+    @pytest.mark.parametrize("size_hint", (1, 3, 10))
+    def test_size_hint(self, size_hint):
+        result = pick_array(DATA, is_type(int), "l", size_hint=size_hint)
+        assert result == array("l", [2, 3, -4])
+
+    def test_nothing_picked(self):
+        assert pick_array([], size_hint=5) == array("d")
+
+    def test_overflow_raises_error(self):
+        with pytest.raises(OverflowError):
+            pick_array([1, 300], typecode="b")
+
+    @pytest.mark.parametrize(
+        "data, typecode, expected",
+        (
+            pytest.param([1, 300], "b", array("h", [1, 300]), id="b to h"),
+            pytest.param([1, 2**20], "h", array("i", [1, 2**20]), id="h to i"),
+            pytest.param([-1, 3], "B", array("b", [-1, 3]), id="B to b"),
+            pytest.param([200, -1], "B", array("h", [200, -1]), id="B to h"),
+            pytest.param([1, -(2**20)], "H", array("i", [1, -(2**20)]), id="H to i"),
+            pytest.param(
+                [2**64 - 1, -1], "Q", array("d", [2**64 - 1, -1]), id="Q to d"
+            ),
+        ),
+    )
+    def test_overflow_widens_optionally(self, data, typecode, expected):
+        result = pick_array(data, typecode=typecode, overflow="widen", size_hint=4)
+        assert result == expected
+        assert result.typecode == expected.typecode
+
+    def test_overflow_of_widest_type_raises_error(self):
+        with pytest.raises(OverflowError):
+            pick_array([10**400], typecode="q", overflow="widen")
+
+    @pytest.mark.parametrize("typecode", ("u", "w"))
+    def test_character_typecode_raises_error(self, typecode):
+        with pytest.raises(ValueError, match="typecode must be numeric"):
+            pick_array(["a"], typecode=typecode, size_hint=1)
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError, match="overflow must be"):
+            pick_array(DATA, is_number, overflow="ignore")
+
+    def test_non_numeric_raises_error(self):
+        with pytest.raises(TypeError):
+            pick_array(DATA)
+
+    def test_ndarray(self):
+        numpy = pytest.importorskip("numpy")
+        result = pick_array(DATA, is_number, ndarray=True)
+        assert isinstance(result, numpy.ndarray)
+        assert result.tolist() == [1.5, 2.0, 3.0, -4.0]
+
+
+class TestPickStrings:
+    def test_strings(self):
+        result = pick_strings(DATA, is_type(str))
+        assert isinstance(result, PackedStrings)
+        assert list(result) == ["x", "yz"]
+
+    def test_dict_keys(self):
+        assert list(pick_strings(DATA, is_type(str), dict_keys=True)) == [
+            "a",
+            "b",
+            "c",
+            "x",
+            "d",
+            "yz",
+        ]
+
+    def test_non_string_raises_error(self):
+        with pytest.raises(TypeError, match="expected str, got list"):
+            pick_strings(DATA)
+
+
+class TestPackedStrings:
+    @pytest.fixture
+    def strings(self):
+        return ["", "spam", "žluťoučký", "\ud800", "🐍"]
+
+    def test_sequence(self, strings):
+        packed = PackedStrings(strings)
+        assert len(packed) == 5
+        assert list(packed) == strings
+        assert packed[1] == "spam"
+        assert packed[-1] == "🐍"
+        assert packed[1:3] == ["spam", "žluťoučký"]
+        assert "spam" in packed
+        assert packed.index("🐍") == 4
+
+    def test_index_out_of_range(self, strings):
+        with pytest.raises(IndexError):
+            PackedStrings(strings)[5]
+        with pytest.raises(IndexError):
+            PackedStrings(strings)[-6]
+
+    def test_append(self):
+        packed = PackedStrings()
+        packed.append("a")
+        packed.extend(["b", "c"])
+        assert list(packed) == ["a", "b", "c"]
+
+    def test_repr(self):
+        assert repr(PackedStrings(["a"])) == "PackedStrings(['a'])"
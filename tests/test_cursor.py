@@ -0,0 +1,80 @@
+import json
+from itertools import islice
+
+import pytest
+
+from handpick import pick, PickCursor, is_type
+
+
+def chunks(data, size, **kwargs):
+    """Pick all objects in chunks, creating a new cursor for each."""
+    picked = []
+    checkpoint = None
+    while checkpoint != ():
+        cursor = PickCursor(data, checkpoint=checkpoint, **kwargs)
+        picked.extend(islice(cursor, size))
+        # round trip through JSON
+        checkpoint = tuple(json.loads(json.dumps(cursor.checkpoint)))
+    return picked
+
+
+class TestSameResultsAsPick:
+    @pytest.mark.parametrize(
+        "kwargs",
+        (
+            pytest.param({}, id="default"),
+            pytest.param({"collections": False}, id="collections=False"),
+            pytest.param({"dict_keys": True}, id="dict_keys=True"),
+            pytest.param({"bytes_like": True}, id="bytes_like=True"),
+            pytest.param({"predicate": is_type(str)}, id="predicate"),
+        ),
+    )
+    def test_fixtures(self, sample_collections, sample_subscriptables, kwargs):
+        for data in (sample_collections, sample_subscriptables):
+            expected = list(pick(data, **kwargs))
+            assert list(PickCursor(data, **kwargs)) == expected
+            for size in (1, 2, 5):
+                assert chunks(data, size, **kwargs) == expected
+
+    def test_custom_sequence(self, custom_sequence):
+        assert chunks([custom_sequence, [3]], 1) == list(pick([custom_sequence, [3]]))
+
+    def test_non_iterable_root_yields_nothing(self):
+        cursor = PickCursor(None)
+        assert list(cursor) == []
+        assert cursor.checkpoint == ()
+
+
+class TestCheckpoint:
+    def test_initial_and_exhausted(self):
+        cursor = PickCursor([1, 2])
+        assert cursor.checkpoint == (0,)
+        list(cursor)
+        assert cursor.checkpoint == ()
+        assert list(PickCursor([1, 2], checkpoint=())) == []
+
+    def test_checkpoint_points_inside_yielded_collection(self):
+        cursor = PickCursor([[1, [2]], 3])
+        assert next(cursor) == [1, [2]]
+        assert cursor.checkpoint == (1, 0)
+        assert list(PickCursor([[1, [2]], 3], checkpoint=(1, 0))) == [1, [2], 2, 3]
+
+    @pytest.mark.parametrize(
+        "checkpoint",
+        (
+            pytest.param((0, 0), id="not entered"),
+            pytest.param((3, 0), id="out of range"),
+            pytest.param((2, 0), id="not a collection"),
+            pytest.param((-1,), id="negative"),
+            pytest.param((7,), id="last position out of range"),
+            pytest.param((1, 2), id="nested last position out of range"),
+        ),
+    )
+    def test_invalid_checkpoint(self, checkpoint):
+        with pytest.raises(ValueError, match="checkpoint does not match data"):
+            PickCursor([[1], 2], checkpoint=checkpoint)
+
+    def test_invalid_checkpoint_in_mapping(self):
+        assert list(PickCursor({"a": 1}, checkpoint=(1,))) == []
+        with pytest.raises(ValueError, match="checkpoint does not match data"):
+            PickCursor({"a": 1}, checkpoint=(2,))
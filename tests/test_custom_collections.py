@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+
+import pytest
+
+from handpick import (
+    pick,
+    values_for_key,
+    max_depth,
+    select,
+    count,
+    register_children,
+    IncrementalPick,
+    PickCursor,
+)
+from handpick.core import _REGISTRY, _EXTRACTORS, _MAX_EXTRACTORS, _is_collection
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    yield
+    _REGISTRY.clear()
+    _EXTRACTORS.clear()
+
+
+@dataclass
+class Point:
+    x: object
+    y: object
+
+
+class Slotted:
+    __slots__ = ("a", "__b")
+
+    def __init__(self, a, b=None):
+        self.a = a
+        if b is not None:
+            self.__b = b
+
+
+class SlottedChild(Slotted):
+    __slots__ = "c"
+
+    def __init__(self, a, b, c):
+        super().__init__(a, b)
+        self.c = c
+
+
+class Node:
+    def __init__(self, *children):
+        self.children = children
+
+    def __handpick_children__(self):
+        return self.children
+
+
+class TestRegistration:
+    def test_not_traversed_by_default(self):
+        point = Point(1, [2])
+        assert not _is_collection(point)
+        assert list(pick([point])) == [point]
+
+    def test_dataclass(self):
+        point = register_children(Point)(1, [2])
+        assert _is_collection(point)
+        assert list(pick([point])) == [point, 1, [2], 2]
+        assert list(pick([point], collections=False)) == [1, 2]
+
+    def test_decorator(self):
+        @register_children
+        @dataclass
+        class Single:
+            value: object
+
+        assert list(pick([Single(Single(1))], collections=False)) == [1]
+
+    def test_slotted_class(self):
+        register_children(Slotted)
+        obj = Slotted(1, [2])
+        assert list(pick([obj])) == [obj, 1, [2], 2]
+
+    def test_unset_slots_are_skipped(self):
+        register_children(Slotted)
+        assert list(pick([Slotted(1)], collections=False)) == [1]
+
+    def test_single_unset_slot_is_skipped(self):
+        @register_children
+        class Single:
+            __slots__ = "value"
+
+        obj = Single()
+        assert list(pick([obj])) == [obj]
+        obj.value = 1
+        assert list(pick([obj])) == [obj, 1]
+
+    def test_subclass_of_registered_class(self):
+        register_children(Slotted)
+        assert list(pick([SlottedChild(1, 2, 3)], collections=False)) == [1, 2]
+
+    def test_subclass_registered_separately(self):
+        register_children(Slotted)
+        register_children(SlottedChild)
+        assert list(pick([SlottedChild(1, 2, 3)], collections=False)) == [1, 2, 3]
+
+    def test_custom_function(self):
+        register_children(Point, lambda point: [point.y])
+        assert list(pick([Point(1, 2)], collections=False)) == [2]
+
+    def test_unsupported_class_raises_error(self):
+        with pytest.raises(TypeError, match="neither a dataclass nor a slotted"):
+            register_children(Node)
+
+
+def test_cached_extractors_are_limited():
+    for _ in range(_MAX_EXTRACTORS + 10):
+        _is_collection(type("Temporary", (), {})())
+    assert len(_EXTRACTORS) <= _MAX_EXTRACTORS
+
+
+def test_dunder_protocol():
+    tree = Node(1, Node(2, [3]), {"a": Node()})
+    assert list(pick(tree, collections=False)) == [1, 2, 3]
+
+
+class TestFunctions:
+    @pytest.fixture
+    def data(self):
+        register_children(Point)
+        return {"a": Point({"id": 1}, [Point(0, {"id": 2})])}
+
+    def test_values_for_key(self, data):
+        assert list(values_for_key(data, "id")) == [1, 2]
+
+    def test_max_depth(self, data):
+        assert max_depth(data) == 4
+
+    def test_select(self, data):
+        assert list(select(data, "**.id")) == [1, 2]
+
+    def test_count(self, data):
+        assert count(data, collections=False) == 3
+
+    def test_incremental_pick(self, data):
+        assert list(IncrementalPick()(data)) == list(pick(data))
+
+    def test_cursor(self, data):
+        assert list(PickCursor(data)) == list(pick(data))
@@ -39,6 +39,44 @@ class TestValuesForKey:
     def test_list_of_keys(self, data, keys, expected):
         assert list(values_for_key(data, keys)) == expected
 
+    def test_many_keys(self):
+        keys = [f"k{i}" for i in range(100)]
+        data = [
+            {"k5": 5, "x": {"k99": 99, "k1": 1}},
+            {k: i for i, k in enumerate(reversed(keys))},
+        ]
+        expected = [5, 1, 99, *reversed(range(100))]
+        assert list(values_for_key(data, keys)) == expected
+
+    def test_many_keys_with_duplicates(self):
+        keys = ["a"] * 50
+        assert list(values_for_key({"a": 1}, keys)) == [1] * 50
+
+    def test_many_keys_with_unhashable_key(self):
+        keys = [[0]] + [str(i) for i in range(50)]
+        assert list(values_for_key([{"1": 1}], keys[1:])) == [1]
+        with pytest.raises(TypeError):
+            list(values_for_key([{"1": 1}], keys))
+
+    @pytest.mark.parametrize(
+        "keys, expected",
+        (
+            pytest.param("a", [{"a": 2, "b": 3}, 5], id="single key"),
+            pytest.param(["b", "a"], [1, {"a": 2, "b": 3}, 5], id="list of keys"),
+            pytest.param(
+                [f"k{i}" for i in range(50)] + ["b", "a"],
+                [1, {"a": 2, "b": 3}, 5],
+                id="many keys",
+            ),
+        ),
+    )
+    def test_outermost(self, keys, expected):
+        data = [{"a": {"a": 2, "b": 3}, "b": 1}, [{"c": {"a": 5}}]]
+        assert list(values_for_key(data, keys, outermost=True)) == expected
+
+    def test_outermost_root(self):
+        assert list(values_for_key({"a": {"a": 1}}, "a", outermost=True)) == [{"a": 1}]
+
 
 @pytest.mark.parametrize(
     "root, expected",
@@ -0,0 +1,200 @@
+import pytest
+
+from handpick import pick, IncrementalPick, diff
+from handpick import core
+from .test_scaling import python_calls
+
+
+class CountingPredicate:
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, obj):
+        self.calls += 1
+        return self.func(obj)
+
+
+def is_int(obj):
+    return isinstance(obj, int)
+
+
+@pytest.fixture
+def document():
+    return {
+        "config": {"debug": False, "level": 3},
+        "log": [{"id": i, "tags": ["a", i]} for i in range(20)],
+    }
+
+
+class TestSameResultsAsPick:
+    @pytest.mark.parametrize(
+        "kwargs",
+        (
+            pytest.param({}, id="default"),
+            pytest.param({"collections": False}, id="collections=False"),
+            pytest.param({"dict_keys": True}, id="dict_keys=True"),
+            pytest.param({"bytes_like": True}, id="bytes_like=True"),
+        ),
+    )
+    def test_fixtures(self, sample_collections, sample_subscriptables, kwargs):
+        query = IncrementalPick(**kwargs)
+        for data in (sample_collections, sample_subscriptables):
+            assert list(query(data)) == list(pick(data, **kwargs))
+            assert list(query(data)) == list(pick(data, **kwargs))
+
+    def test_picked_objects_are_taken_from_current_data(self, document):
+        query = IncrementalPick(lambda obj: isinstance(obj, list))
+        list(query(document))
+        new = {**document, "log": [*document["log"]]}
+        picked = list(query(new))
+        assert picked[0] is new["log"]
+        assert picked[1] is new["log"][0]["tags"]
+
+    def test_non_iterable_root_yields_nothing(self):
+        assert list(IncrementalPick()(None)) == []
+
+    def test_unhashable_leaves(self):
+        leaf = type("Unhashable", (), {"__hash__": None})()
+        query = IncrementalPick()
+        assert list(query([[leaf], [1]])) == [[leaf], leaf, [1], 1]
+        assert list(query([[leaf], [1]])) == [[leaf], leaf, [1], 1]
+
+    def test_non_callable_predicate_raises_error(self):
+        with pytest.raises(TypeError, match="predicate must be callable"):
+            IncrementalPick(42)
+
+
+class TestReuse:
+    def test_unchanged_data_is_not_requeried(self, document):
+        predicate = CountingPredicate(is_int)
+        query = IncrementalPick(predicate)
+        first = list(query(document))
+        calls = predicate.calls
+        assert list(query(document)) == first
+        assert predicate.calls == calls
+
+    def test_only_changed_subtrees_are_requeried(self, document):
+        predicate = CountingPredicate(is_int)
+        query = IncrementalPick(predicate)
+        list(query(document))
+        predicate.calls = 0
+
+        document["config"]["level"] = 4
+        document["log"].append({"id": 20, "tags": []})
+        assert list(query(document)) == list(pick(document, is_int))
+        # root items, config items, new entry and its items
+        assert predicate.calls == 2 + 2 + 1 + 2
+
+    def test_equal_values_of_different_types_are_distinguished(self):
+        query = IncrementalPick(lambda obj: obj is True)
+        assert list(query([[1]])) == []
+        assert list(query([[True]])) == [True]
+
+    def test_hash_equal_ints_are_distinguished(self):
+        query = IncrementalPick(lambda obj: obj == -1)
+        assert list(query([[-2]])) == []
+        assert list(query([[-1]])) == [-1]
+
+    def test_requery_does_less_work_than_pick(self, document):
+        document["log"] *= 50
+        query = IncrementalPick(is_int)
+        list(query(document))
+
+        document["config"]["level"] = 4
+        requery_calls = python_calls(lambda: list(query(document)))
+        pick_calls = python_calls(lambda: list(pick(document, is_int)))
+        assert requery_calls < pick_calls * 0.75
+
+    def test_requery_makes_fewer_checks_than_pick(self, document, monkeypatch):
+        document["log"] *= 50
+        predicate = CountingPredicate(is_int)
+        query = IncrementalPick(predicate)
+        list(query(document))
+
+        checks = []
+        is_collection = core._is_collection
+        monkeypatch.setattr(
+            core,
+            "_is_collection",
+            lambda *args: checks.append(args) or is_collection(*args),
+        )
+        document["config"]["level"] = 4
+        predicate.calls = 0
+        list(query(document))
+        requery = predicate.calls, len(checks)
+
+        checks.clear()
+        predicate.calls = 0
+        list(pick(document, predicate))
+        assert requery[0] < predicate.calls
+        assert requery[1] < len(checks)
+
+    def test_immutable_collections_are_not_rehashed(self, monkeypatch):
+        data = tuple((i, "a", (i, None)) for i in range(100))
+        query = IncrementalPick(is_int)
+        expected = list(query(data))
+
+        calls = []
+        iter_children = core._iter_children
+        monkeypatch.setattr(
+            core,
+            "_iter_children",
+            lambda *args: calls.append(args) or iter_children(*args),
+        )
+        assert list(query(data)) == expected
+        assert calls == []
+
+    def test_mutable_atoms_in_tuples_are_rehashed(self):
+        data = (bytearray(b"a"),)
+        query = IncrementalPick(lambda obj: obj == b"b")
+        assert list(query(data)) == []
+        data[0][0] = ord("b")
+        assert list(query(data)) == [b"b"]
+
+    def test_deep_data(self):
+        data = 1
+        for _ in range(3000):
+            data = [data]
+        query = IncrementalPick(is_int)
+        assert list(query(data)) == [1]
+        assert list(query([data, 2])) == [1, 2]
+
+
+class TestDiff:
+    @pytest.mark.parametrize(
+        "old, new, expected",
+        (
+            pytest.param({"a": [1, 2]}, {"a": [1, 2]}, [], id="equal"),
+            pytest.param({"a": [1, 2]}, {"a": [1, 3]}, [("a", 1)], id="changed"),
+            pytest.param({"a": 1}, {"b": 1}, [("a",), ("b",)], id="keys"),
+            pytest.param([1], [1, [2]], [(1,)], id="appended"),
+            pytest.param([1, 2], [1], [(1,)], id="removed"),
+            pytest.param([1], ["1"], [(0,)], id="type"),
+            pytest.param([1], [1.0], [], id="equal values"),
+            pytest.param({"a": {1}}, {"a": {2}}, [("a",)], id="set"),
+            pytest.param("ab", "ac", [()], id="root"),
+        ),
+    )
+    def test_paths(self, old, new, expected):
+        assert list(diff(old, new)) == expected
+
+    def test_equal_subtrees_are_skipped(self):
+        class Exploding(list):
+            def __getitem__(self, index):
+                raise AssertionError("unexpected access")
+
+        old = {"a": Exploding([1, 2]), "b": 1}
+        new = {"a": Exploding([1, 2]), "b": 2}
+        assert list(diff(old, new)) == [("b",)]
+
+    def test_same_object_is_not_hashed(self, monkeypatch):
+        monkeypatch.setattr(core, "_structure_hash", None)
+        data = [1, 2]
+        assert list(diff(data, data)) == []
+
+    def test_deep_data(self):
+        old, new = 1, 2
+        for _ in range(3000):
+            old, new = [old], [new]
+        assert list(diff(old, new)) == [(0,) * 3000]
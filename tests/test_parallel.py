@@ -0,0 +1,117 @@
+import sys
+
+import pytest
+
+from handpick import pick, values_for_key, max_depth, is_type
+from handpick import core
+
+DATA = [
+    {"id": 1, "items": [[1, 2], {"id": 2, "items": [3, [4, [5]]]}]},
+    [6, (7, 8), {9: {"id": 3}}],
+    "10",
+    [[[[]]]],
+]
+
+
+@pytest.fixture
+def free_threaded(monkeypatch):
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+
+
+@pytest.fixture
+def gil_enabled(monkeypatch):
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+
+    def explode(*args, **kwargs):
+        raise AssertionError("threads used")
+
+    monkeypatch.setattr(core, "ThreadPoolExecutor", explode)
+
+
+@pytest.mark.usefixtures("free_threaded")
+class TestFreeThreaded:
+    @pytest.mark.parametrize("workers", (2, 3, 16))
+    @pytest.mark.parametrize(
+        "kwargs",
+        (
+            pytest.param({}, id="default"),
+            pytest.param({"collections": False}, id="collections=False"),
+            pytest.param({"dict_keys": True}, id="dict_keys=True"),
+            pytest.param({"predicate": is_type(int)}, id="predicate"),
+        ),
+    )
+    def test_pick_ordered(self, workers, kwargs):
+        assert list(pick(DATA, workers=workers, **kwargs)) == list(pick(DATA, **kwargs))
+
+    def test_pick_unordered(self):
+        picked = pick(DATA, is_type(int), workers=4, ordered=False)
+        assert sorted(picked) == sorted(pick(DATA, is_type(int)))
+
+    def test_pick_fixtures(self, sample_collections, sample_subscriptables):
+        for data in (sample_collections, sample_subscriptables):
+            assert list(pick(data, workers=2, bytes_like=True)) == list(
+                pick(data, bytes_like=True)
+            )
+
+    def test_non_iterable_root_yields_nothing(self):
+        assert list(pick(None, workers=2)) == []
+
+    def test_values_for_key(self):
+        assert list(values_for_key(DATA, "id", workers=2)) == [1, 2, 3]
+
+    @pytest.mark.parametrize("workers", (2, 3, 16))
+    def test_max_depth(self, workers):
+        assert max_depth(DATA, workers=workers) == max_depth(DATA) == 6
+        assert max_depth([], workers=workers) == 0
+        assert max_depth(42, workers=workers) == 0
+
+
+def covered_objects(tasks):
+    return sum(
+        len(list(pick(child))) + 1 if descend else 1
+        for obj, _, start, stop, descend in tasks
+        for child in core._range_children(obj, False, start, stop)
+    )
+
+
+def test_tasks_are_balanced_for_skewed_data(free_threaded):
+    data = {f"key{i}": i for i in range(20)}
+    data["items"] = [[i, [i]] for i in range(2000)]
+    tasks = core._split_tasks(data, False, False, 4 * core._TASKS_PER_WORKER)
+    batches = core._batches(tasks, 4)
+    total = covered_objects(tasks)
+    assert total == len(list(pick(data)))
+    assert max(covered_objects(batch) for batch in batches) < total / 4
+    assert list(pick(data, workers=4)) == list(pick(data))
+
+
+def test_large_sequences_are_split_without_inspecting_items(free_threaded, monkeypatch):
+    data = [list(range(200000))] + [[i, [i]] for i in range(10)]
+    checks = []
+    is_collection = core._is_collection
+    monkeypatch.setattr(
+        core,
+        "_is_collection",
+        lambda *args: checks.append(args) or is_collection(*args),
+    )
+    tasks = core._split_tasks(data, False, False, 4 * core._TASKS_PER_WORKER)
+    assert len(checks) < 100
+    assert covered_objects(tasks) == len(list(pick(data)))
+    assert list(pick(data, workers=4)) == list(pick(data))
+    assert max_depth(data, workers=4) == 2
+
+
+@pytest.mark.usefixtures("gil_enabled")
+class TestGilEnabled:
+    def test_fallback(self):
+        assert list(pick(DATA, workers=4)) == list(pick(DATA))
+        assert list(values_for_key(DATA, "id", workers=4)) == [1, 2, 3]
+        assert max_depth(DATA, workers=4) == 6
+
+
+@pytest.mark.parametrize("workers", (0, -1))
+def test_invalid_workers(workers):
+    with pytest.raises(ValueError, match="workers must be a positive integer"):
+        list(pick(DATA, workers=workers))
+    with pytest.raises(ValueError, match="workers must be a positive integer"):
+        max_depth(DATA, workers=workers)
@@ -1,6 +1,8 @@
+from decimal import Decimal
+
 import pytest
 
-from handpick import pick, Predicate
+from handpick import pick, Predicate, BloomFilter
 
 
 class TestCollectionHandling:
@@ -107,6 +109,14 @@ class TestSpecialCases:
     def test_custom_sequence(self, custom_sequence):
         assert list(pick(custom_sequence, bool)) == [1, 2]
 
+    def test_mapping_values_looked_up_by_key(self):
+        class CustomDict(dict):
+            def __getitem__(self, key):
+                return 42
+
+        assert list(pick([CustomDict(a=1)], collections=False)) == [42]
+        assert list(pick([CustomDict(a=1)], dict_keys=True)) == [{"a": 1}, "a", 42]
+
     def test_custom_sequence_no_predicate(self, custom_sequence):
         assert list(pick(custom_sequence)) == [0, 1, 2]
 
@@ -153,3 +163,109 @@ class TestStringsAndBytesLike:
         data = ["foo", 42, b"bar"]
         picked = list(pick(data, collections=False, bytes_like=True))
         assert picked == ["foo", 42, ord("b"), ord("a"), ord("r")]
+
+
+class TestUnique:
+    @pytest.fixture
+    def data(self):
+        return [1, [1, True, "a"], {"x": [1, True, "a"], "y": 1.0}, "a"]
+
+    def test_value(self, data):
+        assert list(pick(data, unique="value", collections=False)) == [1, "a"]
+
+    def test_value_unhashable_raises_error(self, data):
+        with pytest.raises(TypeError):
+            list(pick(data, unique="value"))
+
+    def test_identity(self, data):
+        picked = list(pick(data, unique="identity"))
+        assert picked == [1, [1, True, "a"], True, "a", data[2], data[2]["x"], 1.0]
+        assert picked[5] is data[2]["x"]
+
+    def test_structure(self, data):
+        picked = list(pick(data, unique="structure"))
+        assert picked == [1, [1, True, "a"], True, "a", data[2], 1.0]
+
+    def test_structure_deep_data(self):
+        data = 1
+        for _ in range(3000):
+            data = [data]
+        assert len(list(pick([data, data[0], [data[0]]], unique="structure"))) == 3001
+
+    def test_structure_compares_hashable_leaves_by_value(self):
+        data = [Decimal(1), Decimal(1), [Decimal(2)], [Decimal(2)]]
+        data += [bytearray(b"a"), bytearray(b"a")]
+        picked = list(pick(data, unique="structure", collections=False))
+        assert picked == [Decimal(1), Decimal(2), bytearray(b"a")]
+        picked = list(pick(data, unique="structure"))
+        assert picked == [Decimal(1), [Decimal(2)], Decimal(2), bytearray(b"a")]
+
+    def test_structure_unreliable_hash_falls_back_to_identity(self):
+        leaf = type("Unhashable", (), {"__hash__": None})()
+        data = [[leaf], [leaf], leaf]
+        assert list(pick(data, unique="structure")) == [[leaf], leaf, [leaf]]
+
+    def test_custom_seen(self, data):
+        seen = {"a"}
+        assert list(pick(data, unique="value", seen=seen, collections=False)) == [1]
+        assert seen == {1, "a"}
+
+    def test_bloom_filter(self, data):
+        seen = BloomFilter(100)
+        assert list(pick(data, unique="value", seen=seen, collections=False)) == [
+            1,
+            "a",
+        ]
+
+    def test_invalid_unique(self, data):
+        with pytest.raises(ValueError, match="unique must be"):
+            list(pick(data, unique="equal"))
+
+    def test_seen_without_unique(self, data):
+        with pytest.raises(ValueError, match="seen can only be used with unique"):
+            list(pick(data, seen=set()))
+
+
+class TestBloomFilter:
+    def test_added_objects_are_contained(self):
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(i)
+        assert all(i in bloom for i in range(1000))
+
+    def test_error_rate(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(str(i))
+        false_positives = sum(str(i) in bloom for i in range(1000, 11000))
+        assert false_positives < 200
+
+    def test_bytes(self):
+        bloom = BloomFilter(10)
+        bloom.add(b"spam")
+        assert b"spam" in bloom
+        assert b"eggs" not in bloom
+
+    def test_hash_equal_objects_are_distinguished(self):
+        seen = BloomFilter(1000)
+        assert list(pick([-1, -2, 5], unique="value", seen=seen)) == [-1, -2, 5]
+        assert "-1" not in seen
+
+    def test_equal_numbers_are_contained(self):
+        bloom = BloomFilter(10)
+        bloom.add(1)
+        assert True in bloom
+        assert 1.0 in bloom
+        assert 1 + 0j in bloom
+
+    @pytest.mark.parametrize(
+        "capacity, error_rate, message",
+        (
+            pytest.param(0, 0.1, "capacity", id="capacity"),
+            pytest.param(10, 0, "error_rate", id="error_rate=0"),
+            pytest.param(10, 1, "error_rate", id="error_rate=1"),
+        ),
+    )
+    def test_invalid_arguments(self, capacity, error_rate, message):
+        with pytest.raises(ValueError, match=message):
+            BloomFilter(capacity, error_rate)
@@ -5,6 +5,12 @@ from handpick import (
     no_error,
     values_for_key,
     max_depth,
+    count,
+    first,
+    total,
+    top,
+    select,
+    transform,
 )
 
 
@@ -97,6 +103,37 @@ class TestReadmeExamples:
         assert max_depth({0: {1: {2: {3: {4: 4}}}}}) == 4
         assert max_depth([0, [1, []]]) == 2
 
+    def test_example_select(self):
+        data = {
+            "items": [
+                {"name": "spam", "price": 15},
+                {"name": "eggs", "price": 2},
+            ],
+            "currency": "EUR",
+        }
+
+        @Predicate
+        def is_cheap(item):
+            return item["price"] < 10
+
+        assert list(select(data, "items.*.price")) == [15, 2]
+        assert list(select(data, "items.1.name")) == ["eggs"]
+        assert list(select(data, ["items", "*", is_cheap, "name"])) == ["eggs"]
+        assert list(select({"a": {"id": 1, "b": [{"id": 2}]}}, "**.id")) == [1, 2]
+
+    def test_example_aggregates(self):
+        data = [[4, [5.0, 1], 3.0], [[15, []], {17: [7, [8], 0]}]]
+        assert count(data, is_type(int)) == 6
+        assert first(data, is_type(float)) == 5.0
+        assert total(data, is_type(int)) == 35
+        assert top(data, 3, is_type(int)) == [15, 8, 7]
+
+    def test_example_transform(self):
+        data = {"user": {"name": "spam", "id": 7}, "ids": [1, 2]}
+        result = transform(data, is_type(str), lambda s: "***")
+        assert result == {"user": {"name": "***", "id": 7}, "ids": [1, 2]}
+        assert result["ids"] is data["ids"]
+
     def test_example_flattening(self):
         data = [[], [0], [[[], 1], [2, [3, [4]], []], [5]]]
         assert list(pick(data, collections=False)) == [0, 1, 2, 3, 4, 5]
@@ -0,0 +1,112 @@
+from collections import Counter
+from math import inf
+
+import pytest
+
+from handpick import pick, count, sample, estimate_count, is_type
+from .test_scaling import python_calls
+
+DATA = [{"a": [i, str(i), [i, i]]} for i in range(500)]
+is_int = is_type(int)
+
+
+class TestSample:
+    def test_sample_of_picked_objects(self):
+        result = sample(DATA, 10, is_int, seed=0)
+        assert len(result) == 10
+        assert all(isinstance(obj, int) for obj in result)
+
+    def test_fewer_objects_than_sample_size(self):
+        assert sorted(sample(DATA[:2], 10, is_int, seed=0)) == [0, 0, 0, 1, 1, 1]
+
+    def test_zero_sample_size(self):
+        assert sample(DATA, 0) == []
+
+    def test_negative_sample_size(self):
+        with pytest.raises(ValueError, match="sample size must be non-negative"):
+            sample(DATA, -1)
+
+    def test_seed(self):
+        assert sample(DATA, 5, is_int, seed=1) == sample(DATA, 5, is_int, seed=1)
+
+    def test_uniform(self):
+        counts = Counter()
+        for seed in range(2000):
+            counts.update(sample(list(range(10)), 3, seed=seed))
+        # 600 expected for each number
+        assert all(500 < n < 700 for n in counts.values())
+        assert len(counts) == 10
+
+    def test_keyword_arguments(self):
+        data = [{"k": [1]}]
+        assert sample(data, 5, collections=False, dict_keys=True) in (
+            ["k", 1],
+            [1, "k"],
+        )
+
+    def test_budget_covers_whole_data(self):
+        result = sample(list(range(100_000)), 5, budget=100, seed=0)
+        assert len(result) == 5
+        assert max(result) > 100
+
+    def test_budget_limits_work(self):
+        small, large = list(range(1000)), list(range(100_000))
+        small_calls = python_calls(lambda: sample(small, 5, budget=100, seed=0))
+        large_calls = python_calls(lambda: sample(large, 5, budget=100, seed=0))
+        assert large_calls < small_calls * 1.1
+
+    def test_budget_weights_objects(self):
+        # a random path would lead to 1000 in every other case
+        data = [list(range(1000)), 1000]
+        counts = Counter()
+        for seed in range(200):
+            counts.update(sample(data, 1, is_int, budget=100, seed=seed))
+        assert counts[1000] < 20
+        assert len(counts) > 100
+
+    def test_budget_samples_repeated_objects_separately(self):
+        data = [[0] * 50] * 50
+        kwargs = {"collections": False, "seed": 0}
+        assert sample(data, 5, budget=500, **kwargs) == [0] * 5
+        assert sample(data, 5, **kwargs) == [0] * 5
+
+    def test_budget_non_iterable_root(self):
+        assert sample(None, 5, budget=100) == []
+
+
+class TestEstimateCount:
+    def test_uniform_data(self):
+        # all paths are alike, so the estimate is exact
+        data = [[1, 2]] * 50
+        assert estimate_count(data, is_int, budget=100) == (100, 0, 50)
+
+    def test_estimate(self):
+        estimate = estimate_count(DATA, is_int, seed=0)
+        expected = count(DATA, is_int)
+        assert abs(estimate.count - expected) < 2 * estimate.error
+        assert estimate.error < expected / 10
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        (
+            pytest.param({"collections": False}, id="collections=False"),
+            pytest.param({"dict_keys": True}, id="dict_keys=True"),
+            pytest.param({"bytes_like": True}, id="bytes_like=True"),
+        ),
+    )
+    def test_keyword_arguments(self, sample_collections, kwargs):
+        estimate = estimate_count(sample_collections, seed=0, **kwargs)
+        expected = len(list(pick(sample_collections, **kwargs)))
+        assert abs(estimate.count - expected) < 2 * estimate.error
+
+    def test_budget_limits_work(self):
+        assert estimate_count(DATA, budget=50, seed=0).probes < 20
+
+    def test_single_probe(self):
+        assert estimate_count([1, 2], budget=1) == (2, inf, 1)
+
+    def test_non_iterable_root(self):
+        assert estimate_count(None) == (0, 0, 0)
+
+    def test_empty_collections(self):
+        assert estimate_count([[], {}], seed=0).count == 2
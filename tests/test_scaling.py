@@ -0,0 +1,135 @@
+"""Guard against asymptotic regressions.
+
+Instead of measuring time, count deterministic operations: calls of
+the predicate, calls of `_is_collection`, and calls of Python functions
+including resumptions of generators (which grow with nested depth if
+objects are passed through a chain of generators).
+"""
+
+import sys
+
+import hypothesis.strategies as st
+import pytest
+from hypothesis import given, settings
+
+from handpick import pick, values_for_key, max_depth, select
+from handpick import core
+from .property_based_test import values, strings
+
+SIZES = (250, 500, 1000, 2000)
+
+
+def python_calls(func):
+    """Return the number of Python-level calls and generator resumptions
+    performed by `func()`.
+    """
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "call":
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def deep_document(size):
+    """Return a chain of dicts and lists with `size` nested objects."""
+    data = 0
+    for i in range(size // 2):
+        data = {"key": [data]} if i % 2 else [{"key": data}]
+    return data
+
+
+def wide_document(size):
+    """Return a flat list of dicts with `size` nested objects."""
+    return [{"key": [0]} for _ in range(size // 3)]
+
+
+def node_count(data):
+    count = 0
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        count += 1
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    # root is not inspected
+    return count - 1
+
+
+OPERATIONS = {
+    "pick": lambda data: list(pick(data)),
+    "pick collections=False": lambda data: list(pick(data, collections=False)),
+    "values_for_key": lambda data: list(values_for_key(data, "key")),
+    "max_depth": max_depth,
+    "select **": lambda data: list(select(data, "**")),
+}
+
+
+def cost_per_node(operation, shape, size):
+    data = shape(size)
+    return python_calls(lambda: operation(data)) / node_count(data)
+
+
+@pytest.mark.parametrize("operation", OPERATIONS.values(), ids=OPERATIONS.keys())
+class TestLinearScaling:
+    @pytest.mark.parametrize("shape", (deep_document, wide_document))
+    def test_constant_cost_per_node(self, operation, shape):
+        costs = [cost_per_node(operation, shape, size) for size in SIZES]
+        assert max(costs) < 1.1 * min(costs)
+
+    def test_cost_independent_of_depth(self, operation):
+        deep = cost_per_node(operation, deep_document, SIZES[-1])
+        wide = cost_per_node(operation, wide_document, SIZES[-1])
+        assert deep < 1.5 * wide
+
+    def test_no_recursion_limit(self, operation):
+        operation(deep_document(5 * sys.getrecursionlimit()))
+
+
+class TestExactCounts:
+    def test_predicate_called_once_per_node(self):
+        calls = []
+        data = deep_document(1000)
+        list(pick(data, calls.append))
+        assert len(calls) == node_count(data)
+
+    @pytest.mark.parametrize("shape", (deep_document, wide_document))
+    def test_is_collection_called_once_per_node(self, monkeypatch, shape):
+        calls = []
+        original = core._is_collection
+
+        def counting(obj, bytes_like=False):
+            calls.append(obj)
+            return original(obj, bytes_like)
+
+        monkeypatch.setattr(core, "_is_collection", counting)
+        data = shape(1000)
+        list(pick(data))
+        # plus the root
+        assert len(calls) == node_count(data) + 1
+
+
+documents = st.recursive(
+    values,
+    lambda children: st.lists(children)
+    | st.tuples(children, children)
+    | st.dictionaries(strings, children),
+    max_leaves=100,
+)
+
+
+@settings(deadline=None)
+@given(st.lists(documents))
+def test_cost_bounded_by_node_count(data):
+    bound = 40 * (node_count(data) + 1)
+    for operation in OPERATIONS.values():
+        assert python_calls(lambda: operation(data)) <= bound
@@ -0,0 +1,98 @@
+import pytest
+
+from handpick import select, Predicate, is_type
+
+
+@pytest.fixture
+def catalog():
+    return {
+        "items": [
+            {"name": "spam", "price": 15, "tags": ["food"]},
+            {"name": "eggs", "price": 2, "tags": []},
+            {"name": "ham", "price": 7},
+        ],
+        "0": "zero",
+        "meta": {"name": "catalog", "items": [{"price": 99}]},
+    }
+
+
+class TestKeysAndIndices:
+    @pytest.mark.parametrize(
+        "path, expected",
+        (
+            pytest.param("meta.name", ["catalog"], id="keys"),
+            pytest.param("items.2.name", ["ham"], id="index"),
+            pytest.param(["items", -1, "price"], [7], id="negative index"),
+            pytest.param("0", ["zero"], id="digit key in mapping"),
+            pytest.param("items.3.name", [], id="index out of range"),
+            pytest.param("meta.missing", [], id="missing key"),
+            pytest.param("meta.name.0", [], id="string not subscripted"),
+            pytest.param(["items", "0"], [], id="string index in list step"),
+        ),
+    )
+    def test_lookup(self, catalog, path, expected):
+        assert list(select(catalog, path)) == expected
+
+    def test_empty_path_selects_root(self, catalog):
+        assert list(select(catalog, [])) == [catalog]
+
+    def test_custom_sequence(self, custom_sequence):
+        assert list(select([custom_sequence], "0.2")) == [2]
+
+
+class TestWildcards:
+    def test_any(self, catalog):
+        assert list(select(catalog, "items.*.price")) == [15, 2, 7]
+
+    def test_any_on_mapping_selects_values(self, catalog):
+        assert list(select(catalog, "meta.*")) == ["catalog", [{"price": 99}]]
+
+    def test_any_on_leaf_selects_nothing(self, catalog):
+        assert list(select(catalog, "meta.name.*")) == []
+
+    def test_descend(self, catalog):
+        assert list(select(catalog, "**.price")) == [15, 2, 7, 99]
+
+    def test_descend_includes_current_object(self):
+        assert list(select({"a": 1}, "**.a")) == [1]
+
+    def test_descend_in_middle_of_path(self, catalog):
+        assert list(select(catalog, "meta.**.price")) == [99]
+
+    def test_descend_at_end_of_path(self):
+        assert list(select({"a": [1, {"b": 2}]}, "a.**")) == [
+            [1, {"b": 2}],
+            1,
+            {"b": 2},
+            2,
+        ]
+
+
+class TestPredicateFilters:
+    def test_filter(self, catalog):
+        @Predicate
+        def has_tags(item):
+            return item["tags"]
+
+        assert list(select(catalog, ["items", "*", has_tags, "name"])) == ["spam"]
+
+    def test_filter_after_descend(self, catalog):
+        assert list(select(catalog, ["**", "price", is_type(int)])) == [15, 2, 7, 99]
+
+    def test_plain_callable_is_looked_up_as_key(self):
+        def func():
+            pass
+
+        assert list(select({func: 1}, [func])) == [1]
+
+
+def test_unvisited_siblings_are_not_accessed():
+    class Exploding(dict):
+        def __getitem__(self, key):
+            raise AssertionError("unexpected access")
+
+        def values(self):
+            raise AssertionError("unexpected access")
+
+    data = {"a": {"b": 1}, "c": Exploding()}
+    assert list(select(data, "a.b")) == [1]
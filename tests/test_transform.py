@@ -0,0 +1,137 @@
+from collections import namedtuple, OrderedDict
+from types import MappingProxyType
+
+import pytest
+
+from handpick import transform, is_type, Predicate
+
+Pair = namedtuple("Pair", "left right")
+
+
+def redact(_):
+    return "***"
+
+
+is_str = is_type(str)
+
+
+@pytest.fixture
+def document():
+    return {
+        "user": {"name": "spam", "age": 42},
+        "tags": ["a", 1, ("b", 2)],
+        "untouched": {"list": [1, 2], "set": {3}},
+    }
+
+
+class TestCopy:
+    def test_replaced_objects(self, document):
+        result = transform(document, is_str, redact)
+        assert result == {
+            "user": {"name": "***", "age": 42},
+            "tags": ["***", 1, ("***", 2)],
+            "untouched": {"list": [1, 2], "set": {3}},
+        }
+
+    def test_original_is_unchanged(self, document):
+        transform(document, is_str, redact)
+        assert document["user"]["name"] == "spam"
+        assert document["tags"][2] == ("b", 2)
+
+    def test_unchanged_subtrees_are_shared(self, document):
+        result = transform(document, is_str, redact)
+        assert result is not document
+        assert result["tags"] is not document["tags"]
+        assert result["untouched"] is document["untouched"]
+
+    def test_nothing_replaced_returns_data(self, document):
+        assert transform(document, is_type(float), redact) is document
+
+    def test_replaced_collections_are_not_inspected(self):
+        assert transform([[1, [2]], 3], is_type(list), len) == [2, 3]
+
+    def test_collections_excluded(self):
+        result = transform([[1], 2], Predicate(lambda obj: obj), str, collections=False)
+        assert result == [["1"], "2"]
+
+    def test_dict_keys_are_not_replaced(self):
+        assert transform({"a": "b"}, is_str, str.upper) == {"a": "B"}
+
+    def test_bytes_like(self):
+        data = [b"ab", bytearray(b"c")]
+        result = transform(data, is_type(int), lambda n: n + 1, bytes_like=True)
+        assert result == [b"bc", bytearray(b"d")]
+        assert data == [b"ab", bytearray(b"c")]
+
+    @pytest.mark.parametrize(
+        "data, expected",
+        (
+            pytest.param(("a", 1), ("***", 1), id="tuple"),
+            pytest.param(Pair("a", 1), Pair("***", 1), id="named tuple"),
+            pytest.param(frozenset({"a", 1}), frozenset({"***", 1}), id="frozenset"),
+            pytest.param({"a", 1}, {"***", 1}, id="set"),
+            pytest.param(OrderedDict(a="b"), OrderedDict(a="***"), id="OrderedDict"),
+        ),
+    )
+    def test_collection_types(self, data, expected):
+        result = transform(data, is_str, redact)
+        assert result == expected
+        assert type(result) is type(expected)
+
+    def test_non_iterable_root(self):
+        assert transform(42, None, redact) == 42
+
+    def test_shared_collections_stay_shared(self):
+        inner = ["a"]
+        result = transform([inner, inner], is_str, redact)
+        assert result == [["***"], ["***"]]
+        assert result[0] is result[1]
+
+    def test_deep_data(self):
+        data = "a"
+        for _ in range(3000):
+            data = [data]
+        result = transform(data, is_str, redact)
+        for _ in range(3000):
+            result = result[0]
+        assert result == "***"
+
+    def test_mapping_values_looked_up_by_key(self):
+        class Doubling(dict):
+            def __getitem__(self, key):
+                return 2 * super().__getitem__(key)
+
+        assert transform([Doubling(a=1)], is_type(int), str) == [{"a": "2"}]
+
+    def test_collection_that_cant_be_rebuilt(self):
+        with pytest.raises(TypeError, match="cannot rebuild mappingproxy object"):
+            transform([MappingProxyType({"a": "b"})], is_str, redact)
+
+
+class TestInPlace:
+    def test_mutable_collections_are_modified(self, document):
+        user, tags = document["user"], document["tags"]
+        result = transform(document, is_str, redact, in_place=True)
+        assert result is document
+        assert document["user"] is user
+        assert user["name"] == "***"
+        assert document["tags"] is tags
+        assert tags == ["***", 1, ("***", 2)]
+
+    def test_set(self):
+        data = [{"a", 1}]
+        transform(data, is_str, redact, in_place=True)
+        assert data == [{"***", 1}]
+
+    def test_shared_collections_are_modified_once(self):
+        inner = [1]
+        data = [inner, inner]
+        transform(data, is_type(int), lambda n: n + 1, in_place=True)
+        assert data == [[2], [2]]
+        assert data[0] is inner
+
+    def test_immutable_root_is_copied(self):
+        inner = ["a"]
+        result = transform(("a", inner), is_str, redact, in_place=True)
+        assert result == ("***", ["***"])
+        assert result[1] is inner